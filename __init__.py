@@ -54,207 +54,965 @@ from .node_groups import \
     ensure_feathered_square_group
 from .uv_utils import leftmost_u
 from .camera_align import camera_align_register, camera_align_unregister
+from .bake_profile import apply_bake_profile, restore_render_settings
+from .adaptive_samples import SampleController
+from .bake_scene import ensure_bake_scene, remove_bake_scene
+from .bake_shader import use_bake_outputs, restore_outputs
+from .camera_bake import camera_bake_size, setup_camera_render, load_render_result, link_lighting_vector
+from .vertex_bake import ensure_lighting_attribute, link_lighting_source
+from .denoise import denoise_bake_image
+from .dilate import dilate_bake_image
+from .frustum import objects_in_view
+from .dirty import object_lighting_keys, BakedKeys
+from .light_culling import contributing_lights
+from .bake_cache import lighting_cache_key, geo_digests, frame_input_hash, load_cached_bake, store_cached_bake
+from .static_lighting import find_lighting_variation, find_camera_variation
+from .temporal import LightingKeys, TemporalFilter
+from .lighting_storage import TEXEL_BYTES, last_saved, record_saved, format_bytes
+from .lighting_sequence import RENDER_PASSES, lighting_sequence_prefix, lighting_frame_path, \
+    save_lighting_image, load_lighting_sequence
+from .pipeline import StageScheduler, BakeWatchdog, HEARTBEAT_INTERVAL
+from .stage_clock import StageClock
+from .manifest import RenderManifest, manifest_path, sidecar_path
 from .preferences import register_preferences, unregister_preferences
 
 
-class BakerWithReflections:
-    """Modified Baker that handles reflector materials and preserves holdouts"""
+# Pixels Prep Scene leaves between UV islands with a post-bake margin.
+POST_BAKE_ISLAND_GAP = 2
+
+
+class BakeSession:
+    """The objects, materials and nodes a run of bakes works with, discovered once.
+
+    Looking these up by name and scanning materials on every frame adds
+    up over long renders, so the baker discovers them on its first bake
+    and only checks on later frames that nothing they depend on changed.
+    """
     def __init__(self):
-        self.is_baking = False
-        self.is_done = False
+        self.signature = None
         self.proxy_objects = []
         self.reflector_objects = []
-        self.holdout_objects = []  # Track holdout objects
-        self.hide_render_list = {}
-        self.main_nodes = {}  # Store multiple main nodes for different materials
-        self.reflector_materials = {}  # Track reflector materials
-        self.holdout_materials = {}  # Track holdout materials to preserve them
-
-    def post(self, scene, context=None):
-        self.is_baking = False
-        self.is_done = True
+        self.holdout_objects = []
+        self.holdout_materials = {}
+        self.lights = []
+        self.base_material = None
+        self.delight_image_node = None
+        self.main_nodes = {}  # Material name -> Compify Footage node
+        self.reflector_materials = {}
+        self.image_nodes = []  # (material, Baked Lighting node)
+        self.material_pointers = {}  # Material name -> pointer, to notice replaced materials
+        self.hidden_names = []  # Objects to hide from rendering when baking without a bake scene
+
+    @staticmethod
+    def _signature(context):
+        config = context.scene.compify_config
+        collections = (
+            config.geo_collection, config.reflectors_collection,
+            config.holdout_collection, config.lights_collection,
+        )
+        # Without a bake scene, renamed or replaced objects anywhere in the
+        # scene change what is hidden. That's the only path that hides them,
+        # so only it pays for walking the scene. Reassigned slots change
+        # which reflector materials bake.
+        hides_objects = not config.use_bake_scene and config.bake_space != 'CAMERA'
+        objects = None
+        if hides_objects:
+            objects = tuple((obj.name, obj.as_pointer()) for obj in context.scene.objects)
+        reflector_slots = ()
+        if config.reflectors_collection is not None:
+            reflector_slots = tuple(
+                (obj.name, tuple(slot.material.as_pointer() if slot.material else 0 for slot in obj.material_slots))
+                for obj in config.reflectors_collection.objects
+            )
+        return (context.scene.name, hides_objects, objects, reflector_slots) + tuple(
+            None if c is None else (c.name, tuple(c.objects.keys())) for c in collections
+        )
 
-    def cancelled(self, scene, context=None):
-        self.is_baking = False
-        self.is_done = True
+    def is_valid(self, context):
+        """Cheaply checks that the collections and materials haven't changed since discovery."""
+        if self._signature(context) != self.signature:
+            return False
+        materials = bpy.data.materials
+        return all(
+            name in materials and materials[name].as_pointer() == pointer
+            for name, pointer in self.material_pointers.items()
+        )
 
-    def execute(self, context):
-        # Misc setup and checks.
-        if context.scene.compify_config.geo_collection == None:
-            return {'CANCELLED'}
+    @classmethod
+    def discover(cls, context):
+        """Looks everything up. Returns None if there's nothing to bake."""
+        config = context.scene.compify_config
+        if config.geo_collection == None:
+            return None
+        session = cls()
+        session.signature = cls._signature(context)
 
-        self.proxy_objects = list(context.scene.compify_config.geo_collection.objects)
+        session.proxy_objects = list(config.geo_collection.objects)
+        if len(session.proxy_objects) == 0:
+            return None
 
         # Get reflector objects separately
-        if context.scene.compify_config.reflectors_collection != None:
-            self.reflector_objects = [obj for obj in context.scene.compify_config.reflectors_collection.objects
-                                     if obj.type == 'MESH']
+        if config.reflectors_collection != None:
+            session.reflector_objects = [obj for obj in config.reflectors_collection.objects
+                                         if obj.type == 'MESH']
 
         # Get holdout objects separately - DON'T BAKE THEM
-        if context.scene.compify_config.holdout_collection != None:
-            self.holdout_objects = [obj for obj in context.scene.compify_config.holdout_collection.objects
-                                   if obj.type == 'MESH']
+        if config.holdout_collection != None:
+            session.holdout_objects = [obj for obj in config.holdout_collection.objects
+                                       if obj.type == 'MESH']
             # Store their materials to preserve them
-            for obj in self.holdout_objects:
+            for obj in session.holdout_objects:
                 if obj.data.materials:
                     for mat in obj.data.materials:
                         if mat and "Compify_Reflection_Holdout" in mat.name:
-                            self.holdout_materials[obj.name] = mat
+                            session.holdout_materials[obj.name] = mat
 
-        proxy_lights = []
-        if context.scene.compify_config.lights_collection != None:
-            proxy_lights = context.scene.compify_config.lights_collection.objects
+        if config.lights_collection != None:
+            session.lights = list(config.lights_collection.objects)
 
         # Get the base material
         base_material = bpy.data.materials[compify_mat_name(context)]
-        self.main_nodes[base_material.name] = base_material.node_tree.nodes[MAIN_NODE_NAME]
+        session.base_material = base_material
+        session.main_nodes[base_material.name] = base_material.node_tree.nodes[MAIN_NODE_NAME]
+        session.delight_image_node = base_material.node_tree.nodes[BAKE_IMAGE_NODE_NAME]
+        session.image_nodes.append((base_material, session.delight_image_node))
+        session.material_pointers[base_material.name] = base_material.as_pointer()
 
         # Handle reflector materials
-        for obj in self.reflector_objects:
+        for obj in session.reflector_objects:
             if obj.data.materials:
                 for mat in obj.data.materials:
                     if mat and "_Reflector_" in mat.name and MAIN_NODE_NAME in mat.node_tree.nodes:
-                        self.reflector_materials[mat.name] = mat
-                        self.main_nodes[mat.name] = mat.node_tree.nodes[MAIN_NODE_NAME]
+                        session.reflector_materials[mat.name] = mat
+                        session.main_nodes[mat.name] = mat.node_tree.nodes[MAIN_NODE_NAME]
+                        session.material_pointers[mat.name] = mat.as_pointer()
+                        if BAKE_IMAGE_NODE_NAME in mat.node_tree.nodes:
+                            session.image_nodes.append((mat, mat.node_tree.nodes[BAKE_IMAGE_NODE_NAME]))
                         print(f"Found reflector material {mat.name} for baking")
 
-        # Set up bake image for base material
-        delight_image_node = base_material.node_tree.nodes[BAKE_IMAGE_NODE_NAME]
+        # Everything but the bake objects and lights is hidden when baking
+        # in this scene. NOT holdouts.
+        keep = {obj.name for obj in session.proxy_objects + session.reflector_objects + session.lights}
+        session.hidden_names = [obj.name for obj in context.scene.objects if obj.name not in keep]
+        return session
 
-        if len(self.proxy_objects) == 0:
-            return {'CANCELLED'}
 
-        # Ensure we have an image of the right resolution to bake to.
-        bake_image_name = compify_baked_texture_name(context)
-        bake_res = context.scene.compify_config.bake_image_res
-        if bake_image_name in bpy.data.images \
-        and bpy.data.images[bake_image_name].resolution[0] != bake_res:
-            bpy.data.images.remove(bpy.data.images[bake_image_name])
+class BakerWithReflections:
+    """Modified Baker that handles reflector materials and preserves holdouts"""
+    def __init__(self):
+        self.is_baking = False
+        self.is_done = False
+        self.proxy_objects = []
+        self.reflector_objects = []
+        self.holdout_objects = []  # Track holdout objects
+        self.hide_render_list = {}
+        self.main_nodes = {}  # Store multiple main nodes for different materials
+        self.reflector_materials = {}  # Track reflector materials
+        self.holdout_materials = {}  # Track holdout materials to preserve them
+        self.saved_render_settings = []  # Render settings swapped out by the bake profile
+        self.bake_scene = None  # Isolated scene to bake in, if used
+        self.material_outputs = {}  # Material outputs replaced by the minimal bake shader
+        self.bake_objects = []  # Objects actually baked, after culling and partial rebake
+        self.is_partial = False  # Whether any bake objects were left out
+        self.baked_keys = BakedKeys()  # What each object's texels were last baked with
+        self.camera_space = False  # Whether lighting is rendered from the footage camera instead of baked
+        self.session = None  # What bakes bake with, discovered on the first bake
+        self.vertex_colors = False  # Whether lighting is baked to a color attribute instead of an image
+
+    def post(self, scene, context=None):
+        self.is_baking = False
+        self.is_done = True
 
-        bake_image = None
-        if bake_image_name in bpy.data.images:
-            bake_image = bpy.data.images[bake_image_name]
-        else:
-            bake_image = bpy.data.images.new(
-                bake_image_name,
-                bake_res, bake_res,
-                alpha=False,
-                float_buffer=True,
-                stereo3d=False,
-                is_data=False,
-                tiled=False,
-            )
-        delight_image_node.image = bake_image
+    def cancelled(self, scene, context=None):
+        self.is_baking = False
+        self.is_done = True
 
-        # Also set bake image for reflector materials
-        for mat in self.reflector_materials.values():
-            if BAKE_IMAGE_NODE_NAME in mat.node_tree.nodes:
-                mat.node_tree.nodes[BAKE_IMAGE_NODE_NAME].image = bake_image
-                print(f"Set bake image for reflector material {mat.name}")
+    def execute(self, context, cull=True, partial=True, digests=None):
+        # Discover what to bake with once per run, not on every frame.
+        if self.session is None or not self.session.is_valid(context):
+            self.session = BakeSession.discover(context)
+            if self.session is None:
+                return {'CANCELLED'}
+        session = self.session
+
+        self.proxy_objects = session.proxy_objects
+        self.reflector_objects = session.reflector_objects
+        self.holdout_objects = session.holdout_objects
+        self.holdout_materials = session.holdout_materials
+        self.reflector_materials = session.reflector_materials
+        self.main_nodes = session.main_nodes
+        proxy_lights = session.lights
+
+        # Point the bake image nodes at the bake image. Lighting keys and
+        # lighting sequences may have pointed them elsewhere.
+        self.camera_space = context.scene.compify_config.bake_space == 'CAMERA'
+        self.vertex_colors = context.scene.compify_config.bake_space == 'VERTEX'
+        bake_image = None if self.vertex_colors else ensure_bake_image(context)
+        for mat, node in session.image_nodes:
+            if bake_image is not None and node.image != bake_image:
+                node.image = bake_image
+            link_lighting_vector(mat, self.camera_space)
+            link_lighting_source(mat, self.vertex_colors)
+
+        # Skip objects the camera can't see this frame. Their texels keep
+        # whatever lighting they had.
+        all_bake_objects = [obj for obj in self.proxy_objects + self.reflector_objects if obj.type == 'MESH']
+        self.bake_objects = all_bake_objects
+        camera = context.scene.compify_config.camera or context.scene.camera
+        if cull and context.scene.compify_config.use_frustum_culling and camera is not None:
+            self.bake_objects = objects_in_view(
+                context.scene, camera, all_bake_objects,
+                context.evaluated_depsgraph_get(), context.scene.compify_config.frustum_margin,
+            )
+            if len(self.bake_objects) < len(all_bake_objects):
+                print(f"Frustum culling: baking {len(self.bake_objects)} of {len(all_bake_objects)} objects")
+
+        # Skip objects whose texels already hold the current lighting. A
+        # camera space bake renders the whole image every time.
+        if partial and context.scene.compify_config.use_partial_rebake and not self.camera_space:
+            in_view = len(self.bake_objects)
+            self.bake_objects = self.baked_keys.stale(
+                self.bake_objects, object_lighting_keys(context, self.bake_objects, digests),
+            )
+            if len(self.bake_objects) < in_view:
+                print(f"Partial rebake: baking {len(self.bake_objects)} of {in_view} objects")
+        self.is_partial = len(self.bake_objects) < len(all_bake_objects)
+
+        # Vertex color bakes write to each mesh's active color attribute.
+        # Objects that aren't baked this time still need one to read from.
+        if self.vertex_colors:
+            for obj in all_bake_objects:
+                ensure_lighting_attribute(obj)
+
+        # Leave out lights that can't reach any of the footage geo. Every bake
+        # object counts, as the ones not baked still bounce light.
+        if context.scene.compify_config.use_light_culling and len(proxy_lights) > 0:
+            lights = contributing_lights(context, all_bake_objects, proxy_lights)
+            if len(lights) < len(proxy_lights):
+                print(f"Light culling: baking with {len(lights)} of {len(proxy_lights)} lights")
+            proxy_lights = lights
 
         # Configure ALL materials for baking mode
-        for mat_name, main_node in self.main_nodes.items():
+        for main_node in self.main_nodes.values():
             main_node.inputs["Do Bake"].default_value = 1.0
             main_node.inputs["Debug"].default_value = 0.0
-            print(f"Set bake mode for material {mat_name}")
+
+        # Bake through a plain white diffuse shader instead of the full
+        # Compify and reflector shading.
+        if context.scene.compify_config.use_minimal_bake_shader:
+            self.material_outputs = use_bake_outputs(
+                bpy.data.materials[name] for name in self.main_nodes
+            )
 
         # Set the base material's bake image node as active
-        delight_image_node.select = True
-        base_material.node_tree.nodes.active = delight_image_node
+        session.delight_image_node.select = True
+        session.base_material.node_tree.nodes.active = session.delight_image_node
+
+        # Bake in a scene holding only the bake objects and lights, so
+        # nothing in this scene needs hiding. Camera space bakes are
+        # rendered there too, so they never touch this scene's output.
+        if context.scene.compify_config.use_bake_scene or self.camera_space:
+            self.bake_scene = ensure_bake_scene(
+                context, self.proxy_objects + self.reflector_objects, proxy_lights,
+            )
+            return {'RUNNING_MODAL'}
 
         # Deselect everything.
-        for obj in context.scene.objects:
+        for obj in context.selected_objects:
             obj.select_set(False)
 
         # Build a dictionary of the visibility of non-proxy objects so that
         # we can restore it afterwards. EXCLUDE holdouts from baking
-        all_bake_objects = self.proxy_objects + self.reflector_objects  # NOT holdouts
-        for obj in context.scene.objects:
-            if obj not in all_bake_objects and obj.name not in proxy_lights:
-                self.hide_render_list[obj.name] = obj.hide_render
+        objects = bpy.data.objects
+        hidden = session.hidden_names + [obj.name for obj in session.lights if obj not in proxy_lights]
+        for name in hidden:
+            if name in objects:
+                self.hide_render_list[name] = objects[name].hide_render
 
         # Make all non-proxy objects invisible (INCLUDING holdouts during baking)
         for obj_name in self.hide_render_list:
             bpy.data.objects[obj_name].hide_render = True
 
-        # Set up the baking job event handlers.
-        bpy.app.handlers.object_bake_complete.append(self.post)
-        bpy.app.handlers.object_bake_cancel.append(self.cancelled)
-
         return {'RUNNING_MODAL'}
 
-    def modal(self, context, event):
-        if event.type == 'TIMER':
-            if not self.is_baking and not self.is_done:
-                self.is_baking = True
-
-                # Select objects for baking (NOT including holdouts!)
-                all_bake_objects = self.proxy_objects + self.reflector_objects
-                for obj in all_bake_objects:
-                    if obj.type == 'MESH':
-                        obj.select_set(True)
-
-                if len(all_bake_objects) > 0:
-                    context.view_layer.objects.active = all_bake_objects[0]
-
-                    # Do the bake.
-                    bpy.ops.object.bake(
-                        "INVOKE_DEFAULT",
-                        type='DIFFUSE',
-                        pass_filter={'DIRECT', 'INDIRECT', 'COLOR'},
-                        margin=context.scene.compify_config.bake_uv_margin,
-                        margin_type='EXTEND',
-                        use_selected_to_active=False,
-                        max_ray_distance=0.0,
-                        cage_extrusion=0.0,
-                        cage_object='',
-                        normal_space='TANGENT',
-                        normal_r='POS_X',
-                        normal_g='POS_Y',
-                        normal_b='POS_Z',
-                        target='IMAGE_TEXTURES',
-                        save_mode='INTERNAL',
-                        use_clear=True,
-                        use_cage=False,
-                        use_split_materials=False,
-                        use_automatic_name=False,
-                        uv_layer='',
-                    )
-            elif self.is_done:
-                # Clean up the handlers and timer.
-                bpy.app.handlers.object_bake_complete.remove(self.post)
-                bpy.app.handlers.object_bake_cancel.remove(self.cancelled)
-                self._timer = None
+    def start_bake(self, context, blocking=False, samples=None, seed=None):
+        """Starts the bake job.
 
-                # Restore visibility of non-proxy objects.
-                for obj_name in self.hide_render_list:
-                    bpy.data.objects[obj_name].hide_render = self.hide_render_list[obj_name]
-                self.hide_render_list = {}
+        Completion is signalled through the bake handlers, unless `blocking`
+        is set, in which case the bake has finished when this returns.
+        `samples` and `seed` override the bake's sample count and seed.
+        """
+        self.is_baking = True
 
-                # Set ALL materials back to non-bake mode
-                for mat_name, main_node in self.main_nodes.items():
-                    main_node.inputs["Do Bake"].default_value = 0.0
-                    print(f"Disabled bake mode for material {mat_name}")
+        if self.bake_scene is not None:
+            bake_scene = self.bake_scene
+            view_layer = bake_scene.view_layers[0]
+        else:
+            bake_scene = context.scene
+            view_layer = context.view_layer
+
+        # Select objects for baking (NOT including holdouts!)
+        if self.bake_scene is not None:
+            # The bake scene's selection carries over from the last bake.
+            for obj in view_layer.objects:
+                obj.select_set(False, view_layer=view_layer)
+        for obj in self.bake_objects:
+            obj.select_set(True, view_layer=view_layer)
+
+        if len(self.bake_objects) == 0:
+            self.is_baking = False
+            return {'CANCELLED'}
 
-                self.main_nodes = {}
-                self.reflector_materials = {}
-                self.holdout_materials = {}
+        view_layer.objects.active = self.bake_objects[0]
+
+        # Bake with the bake profile instead of the final render settings.
+        # Calibration bakes several times with different overrides.
+        restore_render_settings(self.saved_render_settings)
+        self.saved_render_settings = apply_bake_profile(context.scene, bake_scene, samples, seed)
+
+        if self.camera_space:
+            return self._render_camera(context, bake_scene, blocking)
+
+        # Do the bake. A post-bake margin is filled in afterwards instead.
+        margin = context.scene.compify_config.bake_uv_margin
+        if context.scene.compify_config.use_post_bake_margin:
+            margin = 0
+        with context.temp_override(scene=bake_scene, view_layer=view_layer):
+            # Clearing the image would also wipe the texels of culled objects.
+            return self._bake(
+                blocking, margin, use_clear=not self.is_partial,
+                target='VERTEX_COLORS' if self.vertex_colors else 'IMAGE_TEXTURES',
+            )
 
-                # Reset other self properties.
-                self.is_baking = False
-                self.is_done = False
-                self.proxy_objects = []
-                self.reflector_objects = []
-                self.holdout_objects = []
+    def _render_camera(self, context, bake_scene, blocking):
+        """Renders the lighting seen by the footage camera, in place of a UV bake.
 
-                return {'FINISHED'}
+        The Compify materials are in bake mode, so the render is their
+        white diffuse shading: the same lighting a UV bake captures.
+        Completion is signalled through the render handlers.
+        """
+        camera = context.scene.compify_config.camera or context.scene.camera
+        if camera is None:
+            self.is_baking = False
+            return {'CANCELLED'}
+        setup_camera_render(bake_scene, context.scene, camera)
+        return bpy.ops.render.render(
+            'EXEC_DEFAULT' if blocking else 'INVOKE_DEFAULT',
+            animation=False,
+            scene=bake_scene.name,
+        )
 
-        return {'PASS_THROUGH'}
+    def fetch_result(self, context):
+        """Brings the result of a finished bake into the bake image, where it isn't already."""
+        if self.camera_space and self.bake_scene is not None:
+            load_render_result(self.bake_scene, ensure_bake_image(context))
+
+    def _bake(self, blocking, margin, use_clear=True, target='IMAGE_TEXTURES'):
+        return bpy.ops.object.bake(
+            'EXEC_DEFAULT' if blocking else 'INVOKE_DEFAULT',
+            type='DIFFUSE',
+            pass_filter={'DIRECT', 'INDIRECT', 'COLOR'},
+            margin=margin,
+            margin_type='EXTEND',
+            use_selected_to_active=False,
+            max_ray_distance=0.0,
+            cage_extrusion=0.0,
+            cage_object='',
+            normal_space='TANGENT',
+            normal_r='POS_X',
+            normal_g='POS_Y',
+            normal_b='POS_Z',
+            target=target,
+            save_mode='INTERNAL',
+            use_clear=use_clear,
+            use_cage=False,
+            use_split_materials=False,
+            use_automatic_name=False,
+            uv_layer='',
+        )
+
+    def finish(self, context):
+        """Restores the scene and materials after a bake has completed or been cancelled."""
+        # Restore visibility of non-proxy objects.
+        for obj_name in self.hide_render_list:
+            bpy.data.objects[obj_name].hide_render = self.hide_render_list[obj_name]
+        self.hide_render_list = {}
+
+        # Restore the render settings the bake profile replaced.
+        restore_render_settings(self.saved_render_settings)
+        self.saved_render_settings = []
+        self.bake_scene = None
+
+        # Switch back from the minimal bake shader.
+        restore_outputs(
+            (bpy.data.materials[name] for name in self.material_outputs if name in bpy.data.materials),
+            self.material_outputs,
+        )
+        self.material_outputs = {}
+
+        # Set ALL materials back to non-bake mode
+        for main_node in self.main_nodes.values():
+            main_node.inputs["Do Bake"].default_value = 0.0
+
+        self.main_nodes = {}
+        self.reflector_materials = {}
+        self.holdout_materials = {}
+
+        # Reset other self properties.
+        self.is_baking = False
+        self.is_done = False
+        self.proxy_objects = []
+        self.reflector_objects = []
+        self.holdout_objects = []
+        self.bake_objects = []
+        self.is_partial = False
+        self.camera_space = False
+        self.vertex_colors = False
 
     def reset(self):
         self.is_baking = False
         self.is_done = False
 
+    def commit_bake(self):
+        """Records that the objects of the last bake now hold its lighting."""
+        self.baked_keys.commit(self.bake_objects)
+
+    def invalidate_bake(self):
+        """Forgets what is in the bake image, after something other than a bake wrote to it."""
+        self.baked_keys.clear()
+
+
+class FramePipeline:
+    """Event-driven bake/render loop shared by CompifyBake and CompifyRender.
+
+    The bake and render completion handlers advance straight to the next
+    stage (bake -> render -> save -> next frame) instead of leaving a flag
+    for a polling timer to pick up, and the wall time of every stage and of
+    the idle gaps between them is recorded per frame.
+
+    With `blocking` set, bakes and renders run synchronously and `start`
+    only returns once the whole range is done. This needs no window or
+    event loop, so it also works under `blender -b`.
+
+    `frames` optionally replaces the frames to render, in order, with any
+    iterable (e.g. frames claimed from a shared queue one at a time); the
+    frame range is then only used for static lighting detection and key
+    frame placement.
+
+    With Bake Every set above one frame, only key frames are baked (a detour
+    to the key frame and back) and the frames in between render with a
+    blend of their two keys' lighting.
+
+    `lighting_pass` splits a render into two passes: 'BAKE' bakes the range
+    and saves the baked lighting as a numbered EXR sequence instead of
+    rendering, and 'RENDER' renders the range against that sequence without
+    baking. Each pass keeps its own manifest, so both can be resumed.
+
+    `worker_id` names the frame queue worker running the pipeline, so
+    workers sharing an output each write their own timing report.
+    """
+    def __init__(self, context, frame_start, frame_end, render=True, blocking=False, frames=None, resume=None,
+                 lighting_pass=None, worker_id=None):
+        self.frame_range = (frame_start, frame_end)
+        if frames is None:
+            frames = range(frame_start, frame_end + 1)
+        self.frame_total = len(frames) if hasattr(frames, "__len__") else None
+        self.frames = iter(frames)
+        self.render = render
+        self.lighting_pass = lighting_pass
+        self.worker_id = worker_id
+        self.blocking = blocking
+        self.baker = BakerWithReflections()
+        self.scheduler = StageScheduler(self.advance, context.window)
+        self.clock = StageClock()
+        # Blocking bakes return when they're done, so only jobs need watching.
+        config = context.scene.compify_config
+        self.watchdog = None
+        if config.use_bake_watchdog and not blocking:
+            self.watchdog = BakeWatchdog(
+                self.bake_lost_callback, config.bake_timeout_factor, config.bake_timeout_min,
+                on_overdue=self.bake_overdue_callback,
+            )
+        self.bake_failure = None  # Why the last bake attempt failed.
+        self.bake_retries = 0  # Failed bake attempts of the current frame.
+        self.bake_issue = None  # Bake failures of the current frame, for the manifest.
+        self.stage = "frame"
+        self.frame = context.scene.frame_current
+        self.lighting_keys = None
+        self.temporal_filter = None
+        self.samples = None
+        self.cache_key = None
+        self.geo_digests = None  # (frame, digests) of the bake objects' geo, shared by the frame's keys
+        self.manifest = None
+        self.resume = context.scene.compify_config.resume_render if resume is None else resume
+        self.input_hash = None
+        self.static_lighting = False
+        self.has_baked = False
+        self.is_finished = False
+        self.is_cancelled = False
+        self.error = None
+
+    def start(self, context):
+        if self.lighting_pass is not None and context.scene.compify_config.bake_space == 'VERTEX':
+            self.error = "Two-pass rendering needs an image bake, not vertex colors"
+            self.is_cancelled = True
+            return
+        if not self.blocking:
+            bpy.app.handlers.object_bake_complete.append(self.bake_complete_callback)
+            bpy.app.handlers.object_bake_cancel.append(self.cancelled_callback)
+            # Camera space bakes are renders.
+            bpy.app.handlers.render_complete.append(self.bake_complete_callback)
+            bpy.app.handlers.render_cancel.append(self.cancelled_callback)
+        if self.render:
+            if not self.blocking and self.lighting_pass != 'BAKE':
+                bpy.app.handlers.render_complete.append(self.render_complete_callback)
+
+            # Bake only once if nothing that affects lighting changes over the range.
+            if context.scene.compify_config.detect_static_lighting and self.lighting_pass != 'RENDER':
+                reason = find_lighting_variation(context, *self.frame_range)
+                self.static_lighting = reason is None
+                if not self.static_lighting:
+                    print(f"Baking every frame: {reason}")
+
+            config = context.scene.compify_config
+            # Keys and the temporal filter blend bake images across frames.
+            # Camera space bakes of different camera positions can't be
+            # blended, as each is projected through its own camera.
+            can_blend = config.bake_space != 'VERTEX'
+            if can_blend and config.bake_space == 'CAMERA':
+                reason = find_camera_variation(context, *self.frame_range)
+                if reason is not None:
+                    can_blend = False
+                    if config.bake_key_step > 1 or config.use_temporal_filter:
+                        print(f"Not blending camera space bakes across frames: {reason}")
+            if not self.static_lighting and config.bake_key_step > 1 and self.lighting_pass != 'RENDER' \
+            and can_blend:
+                self.lighting_keys = LightingKeys(
+                    *self.frame_range, config.bake_key_step, config.bake_key_threshold, config.bake_storage,
+                )
+            # Blended keys and a single static bake don't flicker.
+            if config.use_temporal_filter and not self.static_lighting and self.lighting_keys is None \
+            and self.lighting_pass != 'RENDER' and can_blend:
+                self.temporal_filter = TemporalFilter(
+                    config.temporal_blend, config.temporal_reset_threshold, config.bake_storage,
+                )
+
+            # Per-frame status, kept next to the output so the render can be resumed.
+            self.manifest = RenderManifest(manifest_path(self._output_prefix(context.scene)))
+
+            frame = next(self.frames, None)
+            if frame is None:
+                self.is_finished = True
+            else:
+                context.scene.frame_set(frame)
+                self.frame = frame
+        self.clock.begin_frame(context.scene.frame_current)
+        if self.blocking:
+            self.advance(context)
+        else:
+            self.scheduler.schedule()
+
+    def bake_complete_callback(self, scene, context=None):
+        if self.stage == "baking":
+            if self.watchdog is not None:
+                self.watchdog.stop(succeeded=True)
+            self.clock.end()
+            self.baker.post(scene, context)
+            self.stage = "baked"
+            self.scheduler.schedule()
+
+    def render_complete_callback(self, scene, context=None):
+        if self.stage == "rendering":
+            self.clock.end()
+            self.stage = "rendered"
+            self.scheduler.schedule()
+
+    def cancelled_callback(self, scene, context=None):
+        self.is_cancelled = True
+        self.scheduler.schedule()
+
+    def bake_lost_callback(self, reason):
+        if self.stage == "baking":
+            self.bake_failure = reason
+            self.stage = "bake_failed"
+            self.scheduler.schedule()
+
+    def bake_overdue_callback(self, message):
+        # Only a warning: the bake keeps running, and the stage machine keeps
+        # waiting for it.
+        if self.stage == "baking" and bpy.context.workspace is not None:
+            bpy.context.workspace.status_text_set(f"Compify: {message} (still waiting for it)")
+
+    def advance(self, context):
+        try:
+            self._advance(context)
+        except Exception as e:
+            self.error = str(e)
+            self.is_cancelled = True
+            raise
+        finally:
+            if self.is_finished or self.is_cancelled:
+                self._teardown(context)
+
+    def _advance(self, context):
+        scene = context.scene
+        config = scene.compify_config
+        while not self.is_finished and not self.is_cancelled:
+            # Frame setup.
+            if self.stage == "frame":
+                self.clock.begin("frame_setup")
+                # Hashing the frame's inputs evaluates every proxy mesh, so
+                # only do it for the cache or for resuming.
+                use_cache = self.render and config.use_bake_cache and self.lighting_pass != 'RENDER' \
+                    and config.bake_space != 'VERTEX'
+                resuming = self.resume and self.manifest is not None
+                lighting_key = None
+                if use_cache or resuming:
+                    lighting_key = lighting_cache_key(context, self._geo_digests(context))
+                if use_cache:
+                    self.cache_key = lighting_key
+                self.input_hash = None
+                if resuming:
+                    if self.lighting_pass == 'BAKE':
+                        # Baked lighting doesn't depend on shading or the camera.
+                        self.input_hash = "{}:{}:{}".format(
+                            lighting_key, config.bake_key_step, config.bake_key_threshold)
+                    else:
+                        self.input_hash = frame_input_hash(context, lighting_key)
+                    if self.manifest.is_complete(scene.frame_current, self.input_hash):
+                        print(f"Frame {scene.frame_current} is already rendered, skipping")
+                        self.cache_key = None
+                        self.clock.discard_frame()
+                        self._next_frame(scene)
+                        continue
+                if self.manifest is not None:
+                    self.manifest.record(
+                        scene.frame_current,
+                        status="rendering",
+                        output=self._output_path(scene),
+                        input_hash=self.input_hash,
+                    )
+                self.clock.end()
+                self.stage = "bake"
+            # Bake stage.
+            elif self.stage == "bake":
+                if self.lighting_pass == 'RENDER':
+                    # Lighting comes from the sequence baked by the bake pass.
+                    if not self.has_baked:
+                        image = load_lighting_sequence(scene, self.frame)
+                        if image is None:
+                            self.error = "No baked lighting at {}, run the bake pass first".format(
+                                lighting_frame_path(lighting_sequence_prefix(scene), self.frame))
+                            self.is_cancelled = True
+                            return
+                        link_bake_image(context, image, sequence_end=self.frame_range[1])
+                        self.has_baked = True
+                    self.stage = "render"
+                    continue
+                if self.static_lighting and self.has_baked:
+                    # The one bake for the range is still in the bake image.
+                    self.cache_key = None
+                    self.stage = "render"
+                    continue
+                if self.lighting_keys is not None:
+                    key_frame = self.lighting_keys.next_missing(self.frame)
+                    if key_frame is None:
+                        # Both keys are baked: blend them for this frame.
+                        self.clock.begin("bake_blend")
+                        bake_image = ensure_bake_image(context)
+                        self.lighting_keys.blend_into(self.frame, bake_image)
+                        self.baker.invalidate_bake()
+                        link_bake_image(context, bake_image)
+                        self.clock.end()
+                        self.cache_key = None
+                        self.has_baked = True
+                        self.stage = "render"
+                        continue
+                    if key_frame != scene.frame_current:
+                        self.clock.begin("frame_set")
+                        scene.frame_set(key_frame)
+                        self.clock.end()
+                        self.cache_key = None
+                    if self.cache_key is None and config.use_bake_cache:
+                        self.cache_key = lighting_cache_key(context, self._geo_digests(context))
+                if self.cache_key is not None:
+                    bake_image = ensure_bake_image(context)
+                    if load_cached_bake(context, self.cache_key, bake_image):
+                        self.baker.invalidate_bake()
+                        link_bake_image(context, bake_image)
+                        print(f"Using cached lighting for frame {scene.frame_current}")
+                        self.cache_key = None
+                        self.has_baked = True
+                        self._lighting_ready(context)
+                        continue
+                if config.use_adaptive_samples and self.samples is None and config.bake_space != 'VERTEX':
+                    # The calibration bakes leave a full bake at the found sample count.
+                    self.clock.begin("bake_calibrate")
+                    if not self._calibrate_samples(context):
+                        return
+                    self.clock.end()
+                    self.stage = "baked"
+                    continue
+                self.clock.begin("bake_setup")
+                # A bake that is reused for other frames has to cover
+                # everything, not just what this frame's camera sees.
+                cull = not self.static_lighting and self.lighting_keys is None
+                if self.temporal_filter is not None and (config.use_partial_rebake or config.use_frustum_culling):
+                    # Texels a partial bake leaves alone must hold unfiltered
+                    # lighting, or the cache would store filtered history.
+                    self.temporal_filter.restore(ensure_bake_image(context))
+                digests = self._geo_digests(context) if config.use_partial_rebake else None
+                if self.baker.execute(context, cull=cull, digests=digests) != {'RUNNING_MODAL'}:
+                    self.error = "Nothing to bake"
+                    self.is_cancelled = True
+                    return
+                if self.baker.is_partial and len(self.baker.bake_objects) == 0:
+                    print(f"Nothing to rebake on frame {scene.frame_current}")
+                    self.clock.end()
+                    self.stage = "baked"
+                    continue
+                self.clock.end()
+                self.clock.begin("bake")
+                self.stage = "baking"
+                if 'CANCELLED' in self.baker.start_bake(context, blocking=self.blocking, samples=self.samples):
+                    self.error = f"Failed to bake frame {scene.frame_current}"
+                    self.is_cancelled = True
+                    return
+                if not self.blocking:
+                    if self.watchdog is not None:
+                        self.watchdog.start('RENDER' if self.baker.camera_space else 'OBJECT_BAKE')
+                    return
+                self.clock.end()
+                self.stage = "baked"
+            elif self.stage == "bake_failed":
+                self.clock.end()
+                self.baker.finish(context)
+                self.bake_retries += 1
+                self.bake_issue = {"reason": self.bake_failure, "retries": self.bake_retries, "fallback": False}
+                print(f"Bake of frame {scene.frame_current} failed: {self.bake_failure}")
+                if self.bake_retries <= config.bake_max_retries:
+                    print(f"Retrying the bake ({self.bake_retries} of {config.bake_max_retries})")
+                    self.stage = "bake"
+                    continue
+                if not self.has_baked:
+                    self.error = f"Failed to bake frame {scene.frame_current} after {config.bake_max_retries} retries: {self.bake_failure}"
+                    self.is_cancelled = True
+                    return
+                # The bake image still holds the last lighting that baked.
+                print(f"Using the previous frame's lighting for frame {scene.frame_current}")
+                self.bake_issue["fallback"] = True
+                self.bake_issue["retries"] = config.bake_max_retries
+                self.baker.invalidate_bake()
+                if config.bake_space != 'VERTEX':
+                    link_bake_image(context, ensure_bake_image(context))
+                self.cache_key = None
+                self._lighting_ready(context)
+            elif self.stage == "baked":
+                self.clock.begin("bake_finish")
+                self.baker.fetch_result(context)
+                self.baker.commit_bake()
+                # Texels a partial rebake left alone are already denoised.
+                baked_objects = self.baker.bake_objects if self.baker.is_partial else None
+                self.baker.finish(context)
+                self.clock.end()
+                if config.bake_space != 'VERTEX':
+                    self.clock.begin("bake_denoise")
+                    denoise_bake_image(context, ensure_bake_image(context), baked_objects)
+                    self.clock.end()
+                if config.use_post_bake_margin and config.bake_space == 'UV':
+                    self.clock.begin("bake_dilate")
+                    dilate_bake_image(context, ensure_bake_image(context))
+                    self.clock.end()
+                self.clock.begin("bake_finish")
+                if self.cache_key is not None:
+                    store_cached_bake(context, self.cache_key, ensure_bake_image(context))
+                    self.cache_key = None
+                self.has_baked = True
+                self.clock.end()
+                if self.render:
+                    self._lighting_ready(context)
+                else:
+                    self.clock.end_frame()
+                    self.is_finished = True
+            # Render stage.
+            elif self.stage == "render":
+                if self.lighting_pass == 'BAKE':
+                    # The bake pass saves the lighting instead of rendering.
+                    self.clock.begin("save")
+                    image_path = self._output_path(scene)
+                    print("Saving baked lighting \"{}\"".format(image_path))
+                    save_lighting_image(
+                        scene, ensure_bake_image(context), image_path,
+                        half=scene.compify_config.bake_storage != 'FLOAT',
+                        codec=scene.compify_config.lighting_exr_codec,
+                    )
+                    record_saved(image_path)
+                    self.clock.end()
+                    self._frame_done(context, image_path)
+                    continue
+                self.clock.begin("render")
+                self.stage = "rendering"
+                if not self.blocking:
+                    bpy.ops.render.render("INVOKE_DEFAULT", animation=False)
+                    return
+                if 'CANCELLED' in bpy.ops.render.render('EXEC_DEFAULT', animation=False):
+                    self.error = f"Failed to render frame {scene.frame_current}"
+                    self.is_cancelled = True
+                    return
+                self.clock.end()
+                self.stage = "rendered"
+            elif self.stage == "rendered":
+                self.clock.begin("save")
+                image_path = self._output_path(scene)
+                print("Saving image \"{}\"".format(image_path))
+                bpy.data.images['Render Result'].save_render(filepath=image_path)
+                self.clock.end()
+                self._frame_done(context, image_path)
+            else:
+                # Waiting on a running job.
+                return
+
+    def _lighting_ready(self, context):
+        """Moves on once the bake image holds freshly baked or cached lighting."""
+        if self.lighting_keys is None:
+            if self.temporal_filter is not None:
+                self.clock.begin("bake_temporal")
+                self.temporal_filter.apply(context.scene.frame_current, ensure_bake_image(context))
+                self.clock.end()
+            self.stage = "render"
+            return
+        # That was a key frame: keep it and go back to the frame being rendered.
+        scene = context.scene
+        self.lighting_keys.store(scene.frame_current, ensure_bake_image(context))
+        if scene.frame_current != self.frame:
+            self.clock.begin("frame_set")
+            scene.frame_set(self.frame)
+            self.clock.end()
+        self.stage = "bake"
+
+    def _geo_digests(self, context):
+        """Gets the geo_digests() of the current frame, hashing the bake objects once per frame."""
+        frame = context.scene.frame_current
+        if self.geo_digests is None or self.geo_digests[0] != frame:
+            self.geo_digests = (frame, geo_digests(context))
+        return self.geo_digests[1]
+
+    def _calibrate_samples(self, context):
+        """Finds the bake sample count for the noise target with blocking calibration bakes.
+
+        Leaves the baker set up with a full bake of the current frame in the
+        bake image. Returns False if a bake failed.
+        """
+        config = context.scene.compify_config
+        if self.baker.execute(context, cull=False, partial=False) != {'RUNNING_MODAL'}:
+            self.error = "Nothing to bake"
+            self.is_cancelled = True
+            return False
+
+        def bake(samples, seed):
+            if 'CANCELLED' in self.baker.start_bake(context, blocking=True, samples=samples, seed=seed):
+                raise RuntimeError(f"Failed to bake frame {context.scene.frame_current}")
+            self.baker.fetch_result(context)
+            return ensure_bake_image(context)
+
+        controller = SampleController(config.bake_noise_target, config.bake_max_samples)
+        try:
+            self.samples = controller.calibrate(bake)
+        except RuntimeError as e:
+            self.baker.finish(context)
+            self.error = str(e)
+            self.is_cancelled = True
+            return False
+        print(f"Baking with {self.samples} samples")
+        # The averaged pair isn't a bake the partial rebake can build on.
+        self.baker.invalidate_bake()
+        return True
+
+    def _frame_done(self, context, image_path):
+        scene = context.scene
+        if self.manifest is not None:
+            timings = self.clock.current
+            self.manifest.record(
+                scene.frame_current,
+                status="done",
+                output=image_path,
+                input_hash=self.input_hash,
+                bake_time=sum(v for k, v in timings.items() if k.startswith("bake")),
+                render_time=timings.get("render", 0.0),
+                bake_issue=self.bake_issue,
+            )
+        self.clock.end_frame()
+        self._report_progress(context)
+        self._next_frame(scene)
+
+    def _report_progress(self, context):
+        text = self.clock.progress_text(self.frame_total)
+        if self.watchdog is not None and self.watchdog.is_overdue:
+            text += " | last bake overdue"
+        print(text)
+        if not self.blocking and context.workspace is not None:
+            context.workspace.status_text_set(text)
+
+    def _output_prefix(self, scene):
+        if self.lighting_pass == 'BAKE':
+            return lighting_sequence_prefix(scene)
+        return bpy.path.abspath(scene.render.filepath)
+
+    def _output_path(self, scene):
+        if self.lighting_pass == 'BAKE':
+            return lighting_frame_path(self._output_prefix(scene), scene.frame_current)
+        image_ext = scene.render.file_extension
+        return "{}{:04}{}".format(self._output_prefix(scene), scene.frame_current, image_ext)
+
+    def _next_frame(self, scene):
+        frame = next(self.frames, None)
+        if frame is None:
+            self.is_finished = True
+        else:
+            self.clock.begin_frame(frame)
+            self.clock.begin("frame_set")
+            scene.frame_set(frame)
+            self.clock.end()
+            self.frame = frame
+            self.bake_retries = 0
+            self.bake_issue = None
+            self.stage = "frame"
+
+    def _teardown(self, context):
+        self.scheduler.cancel()
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        for handlers, callback in (
+            (bpy.app.handlers.object_bake_complete, self.bake_complete_callback),
+            (bpy.app.handlers.object_bake_cancel, self.cancelled_callback),
+            (bpy.app.handlers.render_complete, self.bake_complete_callback),
+            (bpy.app.handlers.render_complete, self.render_complete_callback),
+            (bpy.app.handlers.render_cancel, self.cancelled_callback),
+        ):
+            if callback in handlers:
+                handlers.remove(callback)
+        if self.stage in {"baking", "baked", "bake_failed"}:
+            self.baker.finish(context)
+            self.stage = ""
+        remove_bake_scene(context)
+        if context.scene.frame_current != self.frame:
+            # Cancelled while baking a key frame.
+            context.scene.frame_set(self.frame)
+        if self.is_cancelled and self.manifest is not None:
+            entry = self.manifest.entry(context.scene.frame_current)
+            if entry is not None and entry.get("status") == "rendering":
+                self.manifest.record(context.scene.frame_current, status="failed", error=self.error or "cancelled")
+        if not self.blocking and context.workspace is not None:
+            context.workspace.status_text_set(None)
+        if self.render and len(self.clock.frames) > 0:
+            report_name = "compify_timings"
+            if self.worker_id is not None:
+                report_name += f"_worker{self.worker_id}"
+            report_path = sidecar_path(self._output_prefix(context.scene), report_name)
+            self.clock.write_report(report_path)
+            print(f"Compify timing report written to {report_path}.json/.csv")
+        print("Compify stage timings: " + self.clock.summary())
+
 
 def update_reflection_holdout(self, context):
     obj = self.id_data
@@ -579,6 +1337,61 @@ def remove_reflection_holdout_material(obj, context):
                 break
 
 
+def bake_image_size(context):
+    """Gets the (width, height) of the baked lighting image for the configured bake space."""
+    config = context.scene.compify_config
+    if config.bake_space == 'CAMERA':
+        return camera_bake_size(context.scene)
+    return (config.bake_image_res, config.bake_image_res)
+
+
+def ensure_bake_image(context):
+    """Ensures the baked lighting image exists at the configured resolution."""
+    bake_image_name = compify_baked_texture_name(context)
+    size = bake_image_size(context)
+    # Image.resolution is pixels per meter, the pixel dimensions are Image.size.
+    if bake_image_name in bpy.data.images \
+    and tuple(bpy.data.images[bake_image_name].size) != size:
+        bpy.data.images.remove(bpy.data.images[bake_image_name])
+
+    if bake_image_name in bpy.data.images:
+        return bpy.data.images[bake_image_name]
+    return bpy.data.images.new(
+        bake_image_name,
+        size[0], size[1],
+        alpha=False,
+        float_buffer=True,
+        stereo3d=False,
+        is_data=False,
+        tiled=False,
+    )
+
+
+def link_bake_image(context, bake_image, sequence_end=None):
+    """Points the Baked Lighting node of the Compify and reflector materials at `bake_image`.
+
+    For an image sequence numbered by frame, pass the last frame as
+    `sequence_end`.
+    """
+    compify_material = get_compify_material(context)
+    if compify_material is None:
+        return
+    for mat in bpy.data.materials:
+        if mat == compify_material or mat.name.startswith(compify_material.name + "_Reflector_"):
+            if mat.node_tree and BAKE_IMAGE_NODE_NAME in mat.node_tree.nodes:
+                node = mat.node_tree.nodes[BAKE_IMAGE_NODE_NAME]
+                node.image = bake_image
+                link_lighting_vector(mat, context.scene.compify_config.bake_space == 'CAMERA')
+                link_lighting_source(mat, False)
+                if sequence_end is not None:
+                    # Show file number N on frame N.
+                    node.image_user.frame_start = 1
+                    node.image_user.frame_offset = 0
+                    node.image_user.frame_duration = max(sequence_end, 1)
+                    node.image_user.use_cyclic = False
+                    node.image_user.use_auto_refresh = True
+
+
 def get_compify_material(context):
     """Fetches the current scene's compify material if it exists."""
     name = compify_mat_name(context)
@@ -1461,6 +2274,12 @@ class CompifyFootageConfig(bpy.types.PropertyGroup):
         max=2**16,
         soft_max=32,
     )
+    use_post_bake_margin: bpy.props.BoolProperty(
+        name="Post-Bake Margin",
+        description="Bake without a Cycles margin and fill the Bake UV Margin afterwards by copying the nearest baked texel, which is cheaper per bake. Prep Scene then only leaves a 2 pixel gap between UV islands, so the atlas packs tighter",
+        options=set(), # Not animatable.
+        default=False,
+    )
     bake_image_res: bpy.props.IntProperty(
         name="Bake Resolution",
         subtype='PIXEL',
@@ -1470,6 +2289,304 @@ class CompifyFootageConfig(bpy.types.PropertyGroup):
         max=2**16,
         soft_max=8192,
     )
+    bake_space: bpy.props.EnumProperty(
+        name="Bake Space",
+        description="Where baked lighting is stored and looked up",
+        items=[
+            ('UV', "UV Atlas", "Bake the lighting of every footage geo surface to the baking UV map"),
+            ('CAMERA', "Camera", "Render the lighting seen by the footage camera and look it up through the camera projection. Costs scale with the render resolution instead of surface area, but surfaces the camera can't see get no lighting (e.g. in reflections)"),
+            ('VERTEX', "Vertex Colors", "Bake the lighting to a color attribute on each footage geo mesh. Needs no UV unwrap and scales with vertex count, for dense meshes. Bake Every, Temporal Filter, bake denoising, the bake cache and two-pass rendering don't apply"),
+        ],
+        options=set(), # Not animatable.
+        default='UV',
+    )
+    camera_bake_percentage: bpy.props.IntProperty(
+        name="Camera Bake Resolution",
+        description="Resolution of camera space lighting, as a percentage of the render resolution",
+        subtype='PERCENTAGE',
+        options=set(), # Not animatable.
+        default=50,
+        min=1,
+        max=100,
+    )
+    bake_storage: bpy.props.EnumProperty(
+        name="Lighting Storage",
+        description="How baked lighting Compify holds onto (Bake Every keys, the temporal filter) and writes to disk (lighting sequence, bake cache) is stored. The bake image itself is always full float while in use",
+        items=[
+            ('FLOAT', "Full Float", "32-bit float RGBA"),
+            ('HALF', "Half Float", "16-bit float RGBA, half the size"),
+            ('LUMA_CHROMA', "Luminance + Chroma", "Half float luminance at full resolution and color at half resolution, under a quarter of the size. Saved lighting sequences use half float"),
+        ],
+        options=set(), # Not animatable.
+        default='FLOAT',
+    )
+    lighting_exr_codec: bpy.props.EnumProperty(
+        name="EXR Codec",
+        description="Compression of saved lighting sequence EXRs",
+        items=[
+            ('ZIP', "ZIP", "Lossless"),
+            ('PIZ', "PIZ", "Lossless, usually smaller than ZIP for noisy images"),
+            ('DWAA', "DWAA", "Lossy, much smaller"),
+        ],
+        options=set(), # Not animatable.
+        default='ZIP',
+    )
+    use_bake_profile: bpy.props.BoolProperty(
+        name="Bake Profile",
+        description="Bake lighting with its own sampling settings instead of the scene's final render settings. The render settings are restored once each bake is done",
+        options=set(), # Not animatable.
+        default=False,
+    )
+    bake_samples: bpy.props.IntProperty(
+        name="Bake Samples",
+        description="Samples per texel for lighting bakes",
+        options=set(), # Not animatable.
+        default=64,
+        min=1,
+        max=2**24,
+        soft_max=4096,
+    )
+    bake_adaptive_threshold: bpy.props.FloatProperty(
+        name="Noise Threshold",
+        description="Adaptive sampling noise threshold for lighting bakes. Zero disables adaptive sampling",
+        options=set(), # Not animatable.
+        default=0.05,
+        min=0.0,
+        max=1.0,
+        precision=4,
+    )
+    bake_max_bounces: bpy.props.IntProperty(
+        name="Max Bounces",
+        description="Total maximum number of light bounces for lighting bakes",
+        options=set(), # Not animatable.
+        default=4,
+        min=0,
+        max=1024,
+        soft_max=32,
+    )
+    bake_threads: bpy.props.IntProperty(
+        name="Threads",
+        description="Number of CPU threads for lighting bakes. Zero keeps the scene's threads setting",
+        options=set(), # Not animatable.
+        default=0,
+        min=0,
+        max=1024,
+    )
+    use_adaptive_samples: bpy.props.BoolProperty(
+        name="Adaptive Samples",
+        description="Find the bake sample count on the first bake of each render or bake by baking pairs of calibration bakes until the measured noise of the baked lighting is below the Noise Target, and use that count for the rest of the range. Overrides the sample count and adaptive sampling of the bake profile",
+        options=set(), # Not animatable.
+        default=False,
+    )
+    bake_noise_target: bpy.props.FloatProperty(
+        name="Noise Target",
+        description="Noise of the baked lighting to aim for, relative to its mean brightness",
+        subtype='FACTOR',
+        options=set(), # Not animatable.
+        default=0.02,
+        min=0.001,
+        soft_max=0.2,
+        precision=3,
+    )
+    bake_max_samples: bpy.props.IntProperty(
+        name="Max Samples",
+        description="Highest sample count Adaptive Samples will bake with",
+        options=set(), # Not animatable.
+        default=4096,
+        min=2,
+        soft_max=16384,
+    )
+    bake_denoiser: bpy.props.EnumProperty(
+        name="Denoise Bake",
+        description="Denoise the baked lighting after each bake, before it is used or cached",
+        items=[
+            ('NONE', "None", "Use the baked lighting as it is"),
+            ('COMPOSITOR', "Compositor", "Run the baked lighting through the compositor's Denoise node"),
+            ('FILTER', "Edge-Aware Filter", "Smooth the baked lighting within each UV island, keeping lighting edges sharp"),
+        ],
+        options=set(), # Not animatable.
+        default='NONE',
+    )
+    bake_denoise_strength: bpy.props.FloatProperty(
+        name="Filter Strength",
+        description="Relative brightness difference up to which the Edge-Aware Filter smooths texels together. Higher values remove more noise but soften shadow edges",
+        subtype='FACTOR',
+        options=set(), # Not animatable.
+        default=0.5,
+        min=0.01,
+        soft_max=2.0,
+    )
+    use_temporal_filter: bpy.props.BoolProperty(
+        name="Temporal Filter",
+        description="When rendering, blend each frame's baked lighting with a running average of the previous frames' to hide flicker between low-sample bakes. Not used with Bake Every or static lighting",
+        options=set(), # Not animatable.
+        default=False,
+    )
+    temporal_blend: bpy.props.FloatProperty(
+        name="New Frame Weight",
+        description="How much of each new bake goes into the running average. Lower values flicker less but react slower",
+        subtype='FACTOR',
+        options=set(), # Not animatable.
+        default=0.3,
+        min=0.01,
+        max=1.0,
+    )
+    temporal_reset_threshold: bpy.props.FloatProperty(
+        name="Reset Threshold",
+        description="Texels whose brightness changes by more than this (relative) since the last frame use the new bake as it is, so moving lights don't ghost. Keep it above the bake's noise level",
+        subtype='FACTOR',
+        options=set(), # Not animatable.
+        default=0.5,
+        min=0.0,
+        soft_max=2.0,
+    )
+    bake_key_step: bpy.props.IntProperty(
+        name="Bake Every",
+        description="Only bake the lighting every this many frames when rendering, and blend between the two nearest baked frames in between",
+        options=set(), # Not animatable.
+        default=1,
+        min=1,
+        soft_max=50,
+    )
+    bake_key_threshold: bpy.props.FloatProperty(
+        name="Key Threshold",
+        description="Add a baked frame halfway between two baked frames whose lighting differs by more than this (relative to its brightness). Zero only bakes every Bake Every frames",
+        options=set(), # Not animatable.
+        default=0.0,
+        min=0.0,
+        soft_max=1.0,
+        precision=3,
+    )
+    render_passes: bpy.props.EnumProperty(
+        name="Render Passes",
+        description="How Render with Compify schedules baking and rendering",
+        items=[
+            ('INTERLEAVED', "Bake and Render", "Bake and render each frame in turn"),
+            ('TWO_PASS', "Bake Sequence, Then Render", "Bake the whole range to the lighting sequence first, then render the range against it"),
+            ('BAKE', "Bake Sequence Only", "Only bake the range to the lighting sequence"),
+            ('RENDER', "Render From Sequence", "Render the range against a previously baked lighting sequence, without baking"),
+        ],
+        options=set(), # Not animatable.
+        default='INTERLEAVED',
+    )
+    lighting_sequence_path: bpy.props.StringProperty(
+        name="Lighting Sequence",
+        description="Path prefix of the baked lighting EXR sequence written and read by the two-pass modes",
+        subtype='FILE_PATH',
+        options=set(), # Not animatable.
+        default="//compify_lighting/lighting_",
+    )
+    use_minimal_bake_shader: bpy.props.BoolProperty(
+        name="Minimal Bake Shader",
+        description="Bake through a plain white diffuse shader, skipping the footage, camera projection and reflection nodes. Faster, but the footage no longer bounces light onto the footage geo and footage alpha no longer lets light through",
+        options=set(), # Not animatable.
+        default=False,
+    )
+    use_frustum_culling: bpy.props.BoolProperty(
+        name="Frustum Culling",
+        description="Only bake the footage geo and reflectors the footage camera can see on each frame. The lighting of the rest is left as it was. Not used when one bake is shared by several frames (static lighting, Bake Every)",
+        options=set(), # Not animatable.
+        default=False,
+    )
+    frustum_margin: bpy.props.FloatProperty(
+        name="Culling Margin",
+        description="Widen the camera view by this fraction of the frame on every side when culling, to keep objects just off screen (e.g. seen in reflections or motion blur) lit",
+        subtype='FACTOR',
+        options=set(), # Not animatable.
+        default=0.1,
+        min=0.0,
+        soft_max=1.0,
+    )
+    use_light_culling: bpy.props.BoolProperty(
+        name="Light Culling",
+        description="Leave lights out of each bake when their estimated reach (from power and Light Cutoff), spot cone or facing can't touch any footage geo or reflector",
+        options=set(), # Not animatable.
+        default=False,
+    )
+    use_bake_watchdog: bpy.props.BoolProperty(
+        name="Bake Watchdog",
+        description="Watch running bakes, and retry ones whose bake job ends without Blender reporting it finished or cancelled (e.g. after a device error). Bakes running far longer than recent ones get an overdue warning in the status bar",
+        options=set(), # Not animatable.
+        default=True,
+    )
+    bake_timeout_factor: bpy.props.FloatProperty(
+        name="Overdue Warning Factor",
+        description="Warn that a bake is overdue once it runs this many times the median duration of recent bakes. The bake itself is never stopped",
+        options=set(), # Not animatable.
+        default=3.0,
+        min=1.0,
+        soft_max=10.0,
+    )
+    bake_timeout_min: bpy.props.FloatProperty(
+        name="Overdue Warning Minimum",
+        description="Never warn that a bake is overdue before it has run this many seconds. The bake itself is never stopped",
+        subtype='TIME_ABSOLUTE',
+        options=set(), # Not animatable.
+        default=120.0,
+        min=0.0,
+    )
+    bake_max_retries: bpy.props.IntProperty(
+        name="Retries",
+        description="How many times a failed bake is retried before the frame falls back to the previous frame's lighting",
+        options=set(), # Not animatable.
+        default=2,
+        min=0,
+        soft_max=10,
+    )
+    use_partial_rebake: bpy.props.BoolProperty(
+        name="Partial Rebake",
+        description="Remember the lighting each object's texels in the bake image were baked with, and only rebake the objects whose lighting may have changed since. The rest keep their pixels",
+        options=set(), # Not animatable.
+        default=False,
+    )
+    light_influence_cutoff: bpy.props.FloatProperty(
+        name="Light Cutoff",
+        description="Light Culling and Partial Rebake treat a light as reaching an object when its direct light there is estimated above this irradiance (W/m²). Zero makes every light reach everything",
+        options=set(), # Not animatable.
+        default=0.001,
+        min=0.0,
+        soft_max=1.0,
+        precision=4,
+    )
+    bounce_distance: bpy.props.FloatProperty(
+        name="Bounce Distance",
+        description="Partial Rebake rebakes objects within this distance of a footage geo object that changed, for bounce light and contact shadows",
+        subtype='DISTANCE',
+        options=set(), # Not animatable.
+        default=1.0,
+        min=0.0,
+    )
+    use_bake_scene: bpy.props.BoolProperty(
+        name="Isolated Bake Scene",
+        description="Bake in a temporary scene that only links the footage geo, reflectors and lights, instead of hiding every other object of this scene from rendering for each bake",
+        options=set(), # Not animatable.
+        default=True,
+    )
+    detect_static_lighting: bpy.props.BoolProperty(
+        name="Detect Static Lighting",
+        description="Bake only once per render when nothing that affects the lighting (footage geo, lights, world, footage) is animated over the frame range",
+        options=set(), # Not animatable.
+        default=True,
+    )
+    resume_render: bpy.props.BoolProperty(
+        name="Resume Render",
+        description="Skip frames the render manifest next to the output lists as done from the same inputs, and re-render frames whose inputs have changed. Frames are only hashed with this on, so frames rendered without it are rendered again",
+        options=set(), # Not animatable.
+        default=False,
+    )
+    use_bake_cache: bpy.props.BoolProperty(
+        name="Cache Baked Lighting",
+        description="Reuse baked lighting from disk when nothing that affects a frame's lighting has changed",
+        options=set(), # Not animatable.
+        default=False,
+    )
+    bake_cache_dir: bpy.props.StringProperty(
+        name="Cache Directory",
+        description="Directory baked lighting is cached in",
+        subtype='DIR_PATH',
+        options=set(), # Not animatable.
+        default="//compify_bake_cache/",
+    )
 
     # UI Collapse states
     show_footage_section: bpy.props.BoolProperty(
@@ -1921,39 +3038,46 @@ class CompifyPrepScene(bpy.types.Operator):
                 obj.data.materials.append(holdout_materials_to_preserve[obj.name])
                 print(f"Preserved holdout material on {obj.name}")
 
-        # UV unwrap all geometry objects
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.uv.smart_project(
-            angle_limit=(math.pi/180)*60,
-            island_margin=0.001,
-            area_weight=0.0,
-            correct_aspect=False,
-            scale_to_bounds=False,
-        )
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        # UV island margin adjustment
-        try:
-            actual_margin = leftmost_u(context.selected_objects, UV_LAYER_NAME)
-            actual_margin_pixels = actual_margin * context.scene.compify_config.bake_image_res
-            target_margin_with_buffer = context.scene.compify_config.bake_uv_margin * (5.0 / 4.0)
-            correction_factor = target_margin_with_buffer / actual_margin_pixels
+        # Vertex color bakes don't use the baking UV map.
+        if context.scene.compify_config.bake_space != 'VERTEX':
+            # UV unwrap all geometry objects
             bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.uv.select_all(action='SELECT')
+            bpy.ops.mesh.select_all(action='SELECT')
+            bpy.ops.uv.smart_project(
+                angle_limit=(math.pi/180)*60,
+                island_margin=0.001,
+                area_weight=0.0,
+                correct_aspect=False,
+                scale_to_bounds=False,
+            )
+            bpy.ops.object.mode_set(mode='OBJECT')
 
+            # UV island margin adjustment
             try:
-                bpy.ops.uv.pack_islands(rotate=False, margin=0.001 * correction_factor)
-            except TypeError:
+                actual_margin = leftmost_u(context.selected_objects, UV_LAYER_NAME)
+                actual_margin_pixels = actual_margin * context.scene.compify_config.bake_image_res
+                target_margin = context.scene.compify_config.bake_uv_margin
+                if context.scene.compify_config.use_post_bake_margin:
+                    # Filled margins split the gap between islands, so the islands
+                    # only need to be far enough apart for texture filtering.
+                    target_margin = min(target_margin, POST_BAKE_ISLAND_GAP)
+                target_margin_with_buffer = target_margin * (5.0 / 4.0)
+                correction_factor = target_margin_with_buffer / actual_margin_pixels
+                bpy.ops.object.mode_set(mode='EDIT')
+                bpy.ops.uv.select_all(action='SELECT')
+
                 try:
-                    bpy.ops.uv.pack_islands(margin=0.001 * correction_factor)
-                except:
-                    self.report({'WARNING'}, "Could not properly set UV island margins")
+                    bpy.ops.uv.pack_islands(rotate=False, margin=0.001 * correction_factor)
+                except TypeError:
+                    try:
+                        bpy.ops.uv.pack_islands(margin=0.001 * correction_factor)
+                    except:
+                        self.report({'WARNING'}, "Could not properly set UV island margins")
 
-            bpy.ops.object.mode_set(mode='OBJECT')
-        except Exception as e:
-            self.report({'WARNING'}, f"UV adjustment error: {str(e)}")
-            bpy.ops.object.mode_set(mode='OBJECT')
+                bpy.ops.object.mode_set(mode='OBJECT')
+            except Exception as e:
+                self.report({'WARNING'}, f"UV adjustment error: {str(e)}")
+                bpy.ops.object.mode_set(mode='OBJECT')
 
         # NOW set up reflections - this creates special materials for reflectors
         try:
@@ -1984,7 +3108,7 @@ class CompifyBake(bpy.types.Operator):
     bl_options = {'UNDO'}
 
     _timer = None
-    baker = None
+    pipeline = None
 
     @classmethod
     def poll(cls, context):
@@ -1995,25 +3119,26 @@ class CompifyBake(bpy.types.Operator):
             and len(context.scene.compify_config.geo_collection.all_objects) > 0 \
             and compify_mat_name(context) in bpy.data.materials
 
-    def post(self, scene, context=None):
-        if hasattr(self, 'baker') and self.baker:
-            self.baker.post(scene, context)
-
-    def cancelled(self, scene, context=None):
-        if hasattr(self, 'baker') and self.baker:
-            self.baker.cancelled(scene, context)
-
     def execute(self, context):
-        self.baker = BakerWithReflections()  # Use modified baker
-        self._timer = context.window_manager.event_timer_add(0.05, window=context.window)
+        frame = context.scene.frame_current
+        self.pipeline = FramePipeline(context, frame, frame, render=False)
+        self.pipeline.start(context)
+        # The pipeline advances itself from the bake handlers; this timer only
+        # lets the operator notice that it has ended.
+        self._timer = context.window_manager.event_timer_add(HEARTBEAT_INTERVAL, window=context.window)
         context.window_manager.modal_handler_add(self)
-        return self.baker.execute(context)
+        return {'RUNNING_MODAL'}
 
     def modal(self, context, event):
-        result = self.baker.modal(context, event)
-        if result == {'FINISHED'} or result == {'CANCELLED'}:
-            context.window_manager.event_timer_remove(self._timer)
-        return result
+        if not self.pipeline.is_finished and not self.pipeline.is_cancelled:
+            return {'PASS_THROUGH'}
+        context.window_manager.event_timer_remove(self._timer)
+        if self.pipeline.is_cancelled:
+            if self.pipeline.error:
+                self.report({'ERROR'}, self.pipeline.error)
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Compify bake: " + self.pipeline.clock.summary())
+        return {'FINISHED'}
 
 
 class CompifyRender(bpy.types.Operator):
@@ -2022,14 +3147,8 @@ class CompifyRender(bpy.types.Operator):
     bl_label = "Render Animation with Compify Integration"
 
     _timer = None
-    render_started = False
-    render_done = False
-    frame_range = None
-    stage = ""
-    baker = None
-
-    is_finished = False
-    is_cancelled = False
+    pipeline = None
+    passes = []
 
     @classmethod
     def poll(cls, context):
@@ -2073,6 +3192,11 @@ class CompifyRender(bpy.types.Operator):
         format_row.label(text="Format:", icon='IMAGE_DATA')
         format_row.label(text=context.scene.render.image_settings.file_format)
 
+        # Show passes
+        passes_row = settings_col.row()
+        passes_row.label(text="Passes:", icon='RENDERLAYERS')
+        passes_row.prop(context.scene.compify_config, "render_passes", text="")
+
         # Show resolution
         res_row = settings_col.row()
         res_row.label(text="Resolution:", icon='FULLSCREEN_ENTER')
@@ -2100,84 +3224,44 @@ class CompifyRender(bpy.types.Operator):
         question_col.label(text="Have you configured your output settings?", icon='QUESTION')
         question_col.label(text="Click OK to start rendering, or Cancel to adjust settings.", icon='INFO')
 
-    def render_post_callback(self, scene, context=None):
-        self.render_done = True
-
-    def cancelled_callback(self, scene, context=None):
-        self.is_cancelled = True
-
     def execute(self, context):
         """Start the actual rendering process"""
-        self.render_started = False
-        self.render_done = False
-        self.frame_range = (context.scene.frame_start, context.scene.frame_end)
-        self.stage = "bake"
-        self.baker = BakerWithReflections()
-
-        self.is_finished = False
-        self.is_cancelled = False
+        self.passes = list(RENDER_PASSES[context.scene.compify_config.render_passes])
+        self.start_pass(context)
 
-        bpy.app.handlers.render_post.append(self.render_post_callback)
-        bpy.app.handlers.render_cancel.append(self.cancelled_callback)
-        bpy.app.handlers.object_bake_cancel.append(self.cancelled_callback)
-
-        self._timer = context.window_manager.event_timer_add(0.05, window=context.window)
+        # The pipeline advances itself from the bake and render handlers; this
+        # timer only lets the operator notice that it has ended.
+        self._timer = context.window_manager.event_timer_add(HEARTBEAT_INTERVAL, window=context.window)
         context.window_manager.modal_handler_add(self)
 
-        context.scene.frame_set(self.frame_range[0])
-
         # Report that rendering has started
-        self.report({'INFO'}, f"Starting Compify render: frames {self.frame_range[0]} to {self.frame_range[1]}")
+        self.report({'INFO'}, f"Starting Compify render: frames {context.scene.frame_start} to {context.scene.frame_end}")
 
         return {'RUNNING_MODAL'}
 
-    def modal(self, context, event):
-        if self.is_cancelled or self.is_finished:
-            bpy.app.handlers.render_post.remove(self.render_post_callback)
-            bpy.app.handlers.render_cancel.remove(self.cancelled_callback)
-            bpy.app.handlers.object_bake_cancel.remove(self.cancelled_callback)
+    def start_pass(self, context):
+        lighting_pass = self.passes.pop(0)
+        self.pipeline = FramePipeline(
+            context, context.scene.frame_start, context.scene.frame_end, lighting_pass=lighting_pass,
+        )
+        self.pipeline.start(context)
+        if self.pipeline.static_lighting:
+            self.report({'INFO'}, "Lighting is static over the frame range: baking once")
 
-        if self.is_cancelled:
+    def modal(self, context, event):
+        if not self.pipeline.is_finished and not self.pipeline.is_cancelled:
+            return {'PASS_THROUGH'}
+        if self.pipeline.is_finished and self.passes:
+            self.report({'INFO'}, "Compify lighting sequence baked. " + self.pipeline.clock.summary())
+            self.start_pass(context)
+            return {'PASS_THROUGH'}
+        context.window_manager.event_timer_remove(self._timer)
+        if self.pipeline.is_cancelled:
+            if self.pipeline.error:
+                self.report({'ERROR'}, self.pipeline.error)
             return {'CANCELLED'}
-
-        if self.is_finished:
-            return {'FINISHED'}
-
-        if event.type == 'TIMER':
-            # Bake stage.
-            if self.stage == "bake":
-                if not self.baker.is_baking and not self.baker.is_done:
-                    self.baker.execute(context)
-                result = self.baker.modal(context, event)
-                if result == {'FINISHED'}:
-                    self.baker.reset()
-                    self.stage = "render"
-                else:
-                    if result == {'CANCELLED'}:
-                        self.is_cancelled = True
-                    return result
-            # Render stage.
-            elif self.stage == "render":
-                if not self.render_started:
-                    self.render_started = True
-                    bpy.ops.render.render("INVOKE_DEFAULT", animation=False)
-                elif self.render_done:
-                    image_path_start = bpy.path.abspath(context.scene.render.filepath)
-                    image_ext = context.scene.render.file_extension
-                    image_path = "{}{:04}{}".format(image_path_start, context.scene.frame_current, image_ext)
-                    print("Saving image \"{}\"".format(image_path))
-                    bpy.data.images['Render Result'].save_render(filepath=image_path)
-
-                    if context.scene.frame_current >= self.frame_range[1]:
-                        self.is_finished = True
-                        self.report({'INFO'}, "Compify render completed successfully!")
-                    else:
-                        context.scene.frame_set(context.scene.frame_current + 1)
-                        self.render_started = False
-                        self.render_done = False
-                        self.stage = "bake"
-
-        return {'PASS_THROUGH'}
+        self.report({'INFO'}, "Compify render completed successfully! " + self.pipeline.clock.summary())
+        return {'FINISHED'}
 
 class CompifyAddFootageGeoCollection(bpy.types.Operator):
     """Creates and assigns a new empty collection for footage geometry"""
@@ -3298,7 +4382,79 @@ class CompifyPanel(bpy.types.Panel):
             col = box.column()
             col.use_property_split = True
             col.prop(config, "bake_uv_margin")
-            col.prop(config, "bake_image_res")
+            col.prop(config, "use_post_bake_margin")
+            col.prop(config, "bake_space")
+            if config.bake_space == 'CAMERA':
+                col.prop(config, "camera_bake_percentage")
+            elif config.bake_space == 'UV':
+                col.prop(config, "bake_image_res")
+            if config.bake_space != 'VERTEX':
+                col.prop(config, "bake_storage")
+                col.prop(config, "lighting_exr_codec")
+                width, height = bake_image_size(context)
+                texels = width * height
+                info = col.column(align=True)
+                info.label(text="Bake image: " + format_bytes(texels * TEXEL_BYTES['FLOAT']))
+                info.label(text="Stored per frame: " + format_bytes(texels * TEXEL_BYTES[config.bake_storage]))
+                if last_saved["path"] is not None:
+                    info.label(text="Last saved: " + format_bytes(last_saved["size"]))
+            col.separator()
+            col.prop(config, "use_bake_profile")
+            sub = col.column()
+            sub.active = config.use_bake_profile
+            sub.prop(config, "bake_samples")
+            sub.prop(config, "bake_adaptive_threshold")
+            sub.prop(config, "bake_max_bounces")
+            sub.prop(config, "bake_threads")
+            col.prop(config, "use_adaptive_samples")
+            sub = col.column()
+            sub.active = config.use_adaptive_samples
+            sub.prop(config, "bake_noise_target")
+            sub.prop(config, "bake_max_samples")
+            col.prop(config, "bake_denoiser")
+            sub = col.column()
+            sub.active = config.bake_denoiser == 'FILTER'
+            sub.prop(config, "bake_denoise_strength")
+            col.separator()
+            col.prop(config, "render_passes")
+            sub = col.column()
+            sub.active = config.render_passes != 'INTERLEAVED'
+            sub.prop(config, "lighting_sequence_path")
+            col.prop(config, "bake_key_step")
+            sub = col.column()
+            sub.active = config.bake_key_step > 1
+            sub.prop(config, "bake_key_threshold")
+            col.prop(config, "use_temporal_filter")
+            sub = col.column()
+            sub.active = config.use_temporal_filter
+            sub.prop(config, "temporal_blend")
+            sub.prop(config, "temporal_reset_threshold")
+            col.prop(config, "use_bake_scene")
+            col.prop(config, "use_minimal_bake_shader")
+            col.prop(config, "use_light_culling")
+            col.prop(config, "use_partial_rebake")
+            sub = col.column()
+            sub.active = config.use_partial_rebake or config.use_light_culling
+            sub.prop(config, "light_influence_cutoff")
+            sub = col.column()
+            sub.active = config.use_partial_rebake
+            sub.prop(config, "bounce_distance")
+            col.prop(config, "use_frustum_culling")
+            sub = col.column()
+            sub.active = config.use_frustum_culling
+            sub.prop(config, "frustum_margin")
+            col.prop(config, "use_bake_watchdog")
+            sub = col.column()
+            sub.active = config.use_bake_watchdog
+            sub.prop(config, "bake_timeout_factor")
+            sub.prop(config, "bake_timeout_min")
+            sub.prop(config, "bake_max_retries")
+            col.prop(config, "detect_static_lighting")
+            col.prop(config, "resume_render")
+            col.prop(config, "use_bake_cache")
+            sub = col.column()
+            sub.active = config.use_bake_cache
+            sub.prop(config, "bake_cache_dir")
 
         layout.separator(factor=1.0)
 
@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+
+
+# Samples per bake of the first calibration pair.
+START_SAMPLES = 16
+
+# Rec. 709 luminance weights.
+LUMA = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+
+def _read_pixels(image):
+    pixels = np.empty(len(image.pixels), dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels
+
+
+def relative_noise(a, b):
+    """Estimates the noise of the average of two independent bakes, relative to its brightness.
+
+    For two bakes of the same lighting with different seeds, half the
+    squared difference of a texel estimates the variance of one bake, so a
+    quarter of it is the variance of their average. Unbaked (black) texels
+    are ignored.
+    """
+    luma_a = a.reshape(-1, 4)[:, :3] @ LUMA
+    luma_b = b.reshape(-1, 4)[:, :3] @ LUMA
+    mean = (luma_a + luma_b) * 0.5
+    covered = mean > 0.0
+    if not np.any(covered):
+        return 0.0
+    variance = np.mean(np.square(luma_a[covered] - luma_b[covered])) * 0.25
+    return float(math.sqrt(variance) / np.mean(mean[covered]))
+
+
+class SampleController:
+    """Finds the bake sample count that gets baked lighting noise below a target.
+
+    Calibration bakes pairs of bakes with different seeds at increasing
+    sample counts. Noise falls with the square root of the sample count, so
+    each pair's measurement predicts how many samples the target needs and
+    the next pair jumps straight there (at least doubling). The average of
+    the final pair is used as the bake, and its sample count is remembered
+    for the rest of the shot.
+    """
+    def __init__(self, target_noise, max_samples):
+        self.target_noise = target_noise
+        self.max_samples = max(2, max_samples)
+        self.samples = None  # Converged samples per bake, once calibrated.
+
+    def calibrate(self, bake):
+        """Runs calibration bakes through `bake(samples, seed)`, which returns the baked image.
+
+        Leaves the average of the last pair in the image and returns the
+        converged sample count.
+        """
+        samples = min(START_SAMPLES, self.max_samples // 2)
+        while True:
+            a = _read_pixels(bake(samples, 0))
+            image = bake(samples, 1)
+            b = _read_pixels(image)
+            noise = relative_noise(a, b)
+            total = samples * 2
+            print(f"Adaptive samples: noise {noise:.4f} at {total} samples (target {self.target_noise:.4f})")
+            if noise <= self.target_noise:
+                break
+            needed = total * (noise / self.target_noise) ** 2
+            next_samples = min(max(math.ceil(needed / 2), total), self.max_samples // 2)
+            if next_samples <= samples:
+                # Max Samples is reached (rounded down to a whole pair).
+                break
+            samples = next_samples
+
+        image.pixels.foreach_set((a + b) * 0.5)
+        image.update()
+        self.samples = total
+        return total
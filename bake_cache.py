@@ -0,0 +1,361 @@
+import hashlib
+import os
+import tempfile
+
+import bpy
+import numpy as np
+
+from .bake_profile import bake_settings
+from .lighting_storage import pack, unpack, record_saved
+from .names import UV_LAYER_NAME, MAIN_NODE_NAME, BAKE_IMAGE_NODE_NAME
+
+# Compify material inputs that the bake operator sets while baking.
+BAKE_TOGGLED_INPUTS = {(MAIN_NODE_NAME, "Do Bake"), (MAIN_NODE_NAME, "Debug")}
+
+
+# Light data properties that change what ends up in the baked lighting.
+LIGHT_PROPERTIES = (
+    "type", "color", "energy", "shadow_soft_size", "use_shadow",
+    "spot_size", "spot_blend", "angle", "shape", "size", "size_y",
+    "diffuse_factor", "use_nodes",
+)
+
+
+def _hash_value(h, value):
+    """Feeds a property value of any of the common bpy types into a hash."""
+    if isinstance(value, (int, float, bool)):
+        h.update(np.float64(value).tobytes())
+    elif isinstance(value, str):
+        h.update(value.encode())
+    elif isinstance(value, bpy.types.ID):
+        h.update(value.name_full.encode())
+    elif value is None:
+        h.update(b"None")
+    else:
+        try:
+            h.update(np.asarray(value, dtype=np.float64).tobytes())
+        except (TypeError, ValueError):
+            h.update(repr(value).encode())
+
+
+def _hash_node_tree(h, node_tree, skip_nodes=(), skip_inputs=()):
+    """Hashes the nodes, unlinked input values and links of a node tree.
+
+    Nodes named in skip_nodes, and their links, are left out, as are the
+    (node name, input name) pairs in skip_inputs.
+    """
+    if node_tree is None:
+        h.update(b"no-nodes")
+        return
+    for node in sorted(node_tree.nodes, key=lambda n: n.name):
+        if node.name in skip_nodes:
+            continue
+        h.update(node.name.encode())
+        h.update(node.bl_idname.encode())
+        if hasattr(node, "image"):
+            _hash_value(h, node.image)
+        if getattr(node, "node_tree", None) is not None:
+            _hash_node_tree(h, node.node_tree)
+        for socket in node.inputs:
+            if (node.name, socket.name) in skip_inputs:
+                continue
+            if not socket.is_linked and hasattr(socket, "default_value"):
+                _hash_value(h, socket.default_value)
+    for link in node_tree.links:
+        if link.from_node.name in skip_nodes or link.to_node.name in skip_nodes:
+            continue
+        h.update("{}:{}>{}:{}".format(
+            link.from_node.name, link.from_socket.identifier,
+            link.to_node.name, link.to_socket.identifier,
+        ).encode())
+
+
+def _hash_mesh(h, obj_eval):
+    """Hashes the evaluated vertex positions and Compify UVs of a mesh object."""
+    mesh = obj_eval.to_mesh()
+    try:
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        h.update(co.tobytes())
+        if UV_LAYER_NAME in mesh.uv_layers:
+            uv_data = mesh.uv_layers[UV_LAYER_NAME].data
+            uv = np.empty(len(uv_data) * 2, dtype=np.float32)
+            uv_data.foreach_get("uv", uv)
+            h.update(uv.tobytes())
+    finally:
+        obj_eval.to_mesh_clear()
+
+
+def bake_objects_and_lights(config):
+    """Returns the (bake objects, light objects) that take part in a lighting bake."""
+    objects = {}
+    if config.geo_collection is not None:
+        for obj in config.geo_collection.objects:
+            objects[obj.name] = obj
+    if config.reflectors_collection is not None:
+        for obj in config.reflectors_collection.objects:
+            if obj.type == 'MESH':
+                objects[obj.name] = obj
+    lights = []
+    if config.lights_collection is not None:
+        lights = list(config.lights_collection.objects)
+    return list(objects.values()), lights
+
+
+def hash_shared_inputs(h, context, depsgraph, camera=True):
+    """Hashes the bake settings and footage, which affect the lighting of every bake object."""
+    scene = context.scene
+    config = scene.compify_config
+
+    # Bake settings.
+    _hash_value(h, config.bake_image_res)
+    _hash_value(h, config.bake_uv_margin)
+    _hash_value(h, config.use_post_bake_margin)
+    _hash_value(h, config.use_minimal_bake_shader)
+    _hash_value(h, config.use_adaptive_samples)
+    if config.use_adaptive_samples:
+        _hash_value(h, config.bake_noise_target)
+        _hash_value(h, config.bake_max_samples)
+    h.update(config.bake_denoiser.encode())
+    if config.bake_denoiser == 'FILTER':
+        _hash_value(h, config.bake_denoise_strength)
+    h.update(config.bake_space.encode())
+    _hash_value(h, config.use_light_culling)
+    if config.use_light_culling:
+        _hash_value(h, config.light_influence_cutoff)
+    if config.bake_space == 'CAMERA':
+        _hash_value(h, config.camera_bake_percentage)
+        _hash_value(h, (scene.render.resolution_x, scene.render.resolution_y,
+                        scene.render.pixel_aspect_x, scene.render.pixel_aspect_y))
+    if (config.use_frustum_culling or config.bake_space == 'CAMERA') and camera:
+        # Which objects get baked, or what a camera space bake sees, depends
+        # on the camera.
+        camera = config.camera or scene.camera
+        if camera is not None:
+            camera_eval = camera.evaluated_get(depsgraph)
+            _hash_value(h, [v for row in camera_eval.matrix_world for v in row])
+            for prop in ("type", "lens", "ortho_scale", "sensor_width", "sensor_height", "sensor_fit",
+                         "shift_x", "shift_y", "clip_start", "clip_end"):
+                _hash_value(h, getattr(camera_eval.data, prop, None))
+        _hash_value(h, config.frustum_margin)
+    h.update(scene.render.engine.encode())
+    for name, value in sorted(bake_settings(scene).items()):
+        h.update(name.encode())
+        _hash_value(h, value)
+    if hasattr(scene, "cycles"):
+        _hash_value(h, scene.cycles.diffuse_bounces)
+
+    # Footage that shows up in indirect bounces.
+    footage = config.footage
+    if footage is not None:
+        h.update(footage.filepath.encode())
+        h.update(footage.source.encode())
+        if footage.source in {'MOVIE', 'SEQUENCE'}:
+            _hash_value(h, scene.frame_current)
+
+    # Unless the minimal bake shader stands in for them, the bake shades
+    # through the bake objects' own materials. The baked lighting image node
+    # and the sockets the bake operator toggles change around every bake,
+    # so they're left out.
+    if not config.use_minimal_bake_shader:
+        materials = {}
+        bake_objects, _ = bake_objects_and_lights(config)
+        for obj in bake_objects:
+            for slot in obj.material_slots:
+                if slot.material is not None:
+                    materials[slot.material.name] = slot.material
+        for name in sorted(materials):
+            h.update(name.encode())
+            _hash_node_tree(h, materials[name].node_tree,
+                            skip_nodes={BAKE_IMAGE_NODE_NAME},
+                            skip_inputs=BAKE_TOGGLED_INPUTS)
+
+
+def _hash_geo(h, obj_eval):
+    h.update(obj_eval.name.encode())
+    _hash_value(h, [v for row in obj_eval.matrix_world for v in row])
+    if obj_eval.type == 'MESH':
+        _hash_mesh(h, obj_eval)
+
+
+def hash_light(h, obj_eval):
+    """Hashes the evaluated transform and settings of a light (or the geometry of an emissive mesh)."""
+    h.update(obj_eval.name.encode())
+    _hash_value(h, obj_eval.hide_render)
+    _hash_value(h, [v for row in obj_eval.matrix_world for v in row])
+    if obj_eval.type == 'LIGHT':
+        for prop in LIGHT_PROPERTIES:
+            if hasattr(obj_eval.data, prop):
+                _hash_value(h, getattr(obj_eval.data, prop))
+        if obj_eval.data.use_nodes:
+            _hash_node_tree(h, obj_eval.data.node_tree)
+    elif obj_eval.type == 'MESH':
+        _hash_mesh(h, obj_eval)
+
+
+def hash_world(h, scene, depsgraph):
+    """Hashes the scene's world color and nodes."""
+    if scene.world is not None:
+        world_eval = scene.world.evaluated_get(depsgraph)
+        h.update(world_eval.name.encode())
+        _hash_value(h, world_eval.color)
+        if world_eval.use_nodes:
+            _hash_node_tree(h, world_eval.node_tree)
+    else:
+        h.update(b"no-world")
+
+
+def geo_digests(context):
+    """Gets {object name: digest} of the evaluated transform and geometry of every bake object.
+
+    Hashing evaluates every proxy mesh, so a frame that needs both a
+    lighting cache key and object lighting keys can share one result.
+    """
+    depsgraph = context.evaluated_depsgraph_get()
+    bake_objects, _ = bake_objects_and_lights(context.scene.compify_config)
+    digests = {}
+    for obj in bake_objects:
+        h = hashlib.sha1()
+        _hash_geo(h, obj.evaluated_get(depsgraph))
+        digests[obj.name] = h.digest()
+    return digests
+
+
+def lighting_cache_key(context, digests=None):
+    """Builds a content hash of everything that affects the current frame's bake.
+
+    This covers the evaluated transforms and geometry of the proxy geo, the
+    evaluated transforms and settings of the lights, the world, the bake
+    settings and (for animated footage) the footage frame, since the footage
+    is emitted into indirect bounces while baking. With frustum culling on,
+    the camera decides which objects get baked, so it is covered as well.
+    `digests` are the frame's geo_digests(), if already computed.
+    """
+    scene = context.scene
+    depsgraph = context.evaluated_depsgraph_get()
+    h = hashlib.sha1()
+
+    hash_shared_inputs(h, context, depsgraph)
+    if digests is None:
+        digests = geo_digests(context)
+    for name in sorted(digests):
+        h.update(digests[name])
+    _, lights = bake_objects_and_lights(scene.compify_config)
+    for obj in sorted(lights, key=lambda o: o.name):
+        hash_light(h, obj.evaluated_get(depsgraph))
+    hash_world(h, scene, depsgraph)
+
+    return h.hexdigest()
+
+
+def bake_cache_dir(context):
+    """Gets the absolute directory baked lighting is cached in, creating it if needed."""
+    path = context.scene.compify_config.bake_cache_dir
+    if path.startswith("//") and not bpy.data.filepath:
+        # Relative paths can't be resolved for unsaved files.
+        path = os.path.join(tempfile.gettempdir(), "compify_bake_cache")
+    path = bpy.path.abspath(path)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _cache_path(context, key):
+    return os.path.join(bake_cache_dir(context), key + ".npz")
+
+
+def load_cached_bake(context, key, image):
+    """Fills `image` with the cached bake for `key`.
+
+    Returns True on a cache hit, False if there is no usable entry.
+    """
+    path = _cache_path(context, key)
+    if not os.path.exists(path):
+        return False
+    try:
+        with np.load(path) as entry:
+            pixels = unpack(dict(entry))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unreadable bake cache entry {path}: {e}")
+        return False
+    if pixels.size != len(image.pixels):
+        return False
+    image.pixels.foreach_set(pixels)
+    image.update()
+    return True
+
+
+def store_cached_bake(context, key, image):
+    """Writes the pixels of the freshly baked `image` to the cache under `key`.
+
+    Entries are stored in the scene's Lighting Storage mode.
+    """
+    pixels = np.empty(len(image.pixels), dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    packed = pack(pixels, image.size[0], context.scene.compify_config.bake_storage)
+    path = _cache_path(context, key)
+    # Write to a temporary file first so an interrupted save never leaves
+    # a truncated entry behind. Each save gets its own, since render workers
+    # may store the same key at the same time.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **packed)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    record_saved(path)
+
+
+def frame_input_hash(context, lighting_key=None):
+    """Builds a hash of the inputs of a rendered frame, for resuming renders.
+
+    Covers the frame's lighting (see lighting_cache_key), the footage
+    camera, the render settings and, for every renderable object, its
+    evaluated transform, data, vertex count and materials. Edits that move
+    vertices without changing their count are only picked up for footage
+    geo and lights.
+    """
+    scene = context.scene
+    depsgraph = context.evaluated_depsgraph_get()
+    h = hashlib.sha1()
+
+    h.update((lighting_key or lighting_cache_key(context)).encode())
+    _hash_value(h, scene.frame_current)
+    # Frames between bake keys are lit from other frames' bakes.
+    _hash_value(h, scene.compify_config.bake_key_step)
+    _hash_value(h, scene.compify_config.bake_key_threshold)
+
+    # Camera and render settings.
+    if scene.camera is not None:
+        camera_eval = scene.camera.evaluated_get(depsgraph)
+        _hash_value(h, [v for row in camera_eval.matrix_world for v in row])
+        for prop in ("lens", "sensor_width", "sensor_height", "shift_x", "shift_y", "clip_start", "clip_end"):
+            _hash_value(h, getattr(camera_eval.data, prop, None))
+    render = scene.render
+    for prop in ("resolution_x", "resolution_y", "resolution_percentage", "pixel_aspect_x",
+                 "pixel_aspect_y", "film_transparent", "engine"):
+        _hash_value(h, getattr(render, prop))
+    h.update(render.image_settings.file_format.encode())
+    if hasattr(scene, "cycles"):
+        _hash_value(h, scene.cycles.samples)
+
+    # Everything that gets rendered.
+    materials = {}
+    for obj in sorted(scene.objects, key=lambda o: o.name):
+        if obj.hide_render:
+            continue
+        obj_eval = obj.evaluated_get(depsgraph)
+        h.update(obj.name.encode())
+        _hash_value(h, [v for row in obj_eval.matrix_world for v in row])
+        _hash_value(h, obj.data)
+        if obj.type == 'MESH':
+            _hash_value(h, len(obj_eval.data.vertices))
+        for slot in obj.material_slots:
+            if slot.material is not None:
+                materials[slot.material.name] = slot.material
+                h.update(slot.material.name.encode())
+    for name in sorted(materials):
+        _hash_node_tree(h, materials[name].node_tree)
+
+    return h.hexdigest()
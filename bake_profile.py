@@ -0,0 +1,73 @@
+# Cycles settings the bake profile overrides, as
+# (scene.cycles setting, bake profile property on the Compify config).
+PROFILE_SETTINGS = (
+    ("samples", "bake_samples"),
+    ("max_bounces", "bake_max_bounces"),
+)
+
+
+def bake_settings(scene):
+    """Returns the Cycles sampling settings a lighting bake of `scene` runs with."""
+    config = scene.compify_config
+    if not hasattr(scene, "cycles"):
+        return {}
+    if not config.use_bake_profile:
+        settings = {name: getattr(scene.cycles, name) for name, _ in PROFILE_SETTINGS}
+        settings["adaptive_threshold"] = scene.cycles.adaptive_threshold \
+            if scene.cycles.use_adaptive_sampling else 0.0
+        return settings
+    settings = {name: getattr(config, prop) for name, prop in PROFILE_SETTINGS}
+    settings["adaptive_threshold"] = config.bake_adaptive_threshold
+    return settings
+
+
+def apply_bake_profile(scene, target=None, samples=None, seed=None):
+    """Swaps the render settings of `target` (default: `scene`) for `scene`'s bake profile.
+
+    `samples` and `seed` override the sample count (with adaptive sampling
+    off) and the seed, whether or not the bake profile is on.
+
+    Returns the original settings for restore_render_settings(), or an empty
+    list if nothing was changed.
+    """
+    config = scene.compify_config
+    if target is None:
+        target = scene
+    if not hasattr(target, "cycles"):
+        return []
+
+    saved = []
+
+    def swap(owner, name, value):
+        saved.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    if samples is not None:
+        swap(target.cycles, "samples", samples)
+        swap(target.cycles, "use_adaptive_sampling", False)
+    if seed is not None:
+        swap(target.cycles, "use_animated_seed", False)
+        swap(target.cycles, "seed", seed)
+    if not config.use_bake_profile:
+        return saved
+
+    for name, prop in PROFILE_SETTINGS:
+        if name == "samples" and samples is not None:
+            continue
+        swap(target.cycles, name, getattr(config, prop))
+    # A threshold of zero turns adaptive sampling off rather than using
+    # Cycles' automatic threshold. A sample override keeps it off.
+    if samples is None:
+        swap(target.cycles, "use_adaptive_sampling", config.bake_adaptive_threshold > 0.0)
+        if config.bake_adaptive_threshold > 0.0:
+            swap(target.cycles, "adaptive_threshold", config.bake_adaptive_threshold)
+    if config.bake_threads > 0:
+        swap(target.render, "threads_mode", 'FIXED')
+        swap(target.render, "threads", config.bake_threads)
+    return saved
+
+
+def restore_render_settings(saved):
+    """Undoes apply_bake_profile()."""
+    for owner, name, value in reversed(saved):
+        setattr(owner, name, value)
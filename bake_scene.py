@@ -0,0 +1,61 @@
+import bpy
+
+from .names import compify_bake_scene_name
+
+
+def _copy_settings(source, target):
+    """Copies every writable property of an RNA struct (e.g. scene.cycles) onto another."""
+    for prop in source.bl_rna.properties:
+        if prop.is_readonly or prop.identifier == "rna_type" or prop.type in {'POINTER', 'COLLECTION'}:
+            continue
+        try:
+            setattr(target, prop.identifier, getattr(source, prop.identifier))
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+
+def ensure_bake_scene(context, bake_objects, lights):
+    """Gets the scene lighting is baked in, creating it if needed.
+
+    The bake scene holds nothing but links to `bake_objects`, `lights` and
+    the footage camera, and shares the world and render settings of the
+    active scene. Baking there keeps everything else out of the bake
+    without touching the visibility of any object in the active scene.
+    """
+    scene = context.scene
+    name = compify_bake_scene_name(context)
+    bake_scene = bpy.data.scenes.get(name)
+    if bake_scene is None:
+        bake_scene = bpy.data.scenes.new(name)
+        bake_scene.render.engine = scene.render.engine
+        if hasattr(scene, "cycles"):
+            _copy_settings(scene.cycles, bake_scene.cycles)
+        bake_scene.render.threads_mode = scene.render.threads_mode
+        bake_scene.render.threads = scene.render.threads
+    bake_scene.world = scene.world
+
+    # Sync the linked objects. Only the bake scene's few objects are
+    # visited, never the objects of the active scene.
+    wanted = {obj.name: obj for obj in list(bake_objects) + list(lights)}
+    camera = scene.compify_config.camera
+    if camera is not None:
+        wanted[camera.name] = camera
+    linked = bake_scene.collection.objects
+    for obj in list(linked):
+        if obj.name not in wanted:
+            linked.unlink(obj)
+    for obj in wanted.values():
+        if obj.name not in linked:
+            linked.link(obj)
+    for child in list(bake_scene.collection.children):
+        bake_scene.collection.children.unlink(child)
+
+    bake_scene.frame_set(scene.frame_current)
+    return bake_scene
+
+
+def remove_bake_scene(context):
+    """Removes the active scene's bake scene, if there is one."""
+    bake_scene = bpy.data.scenes.get(compify_bake_scene_name(context))
+    if bake_scene is not None:
+        bpy.data.scenes.remove(bake_scene)
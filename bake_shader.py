@@ -0,0 +1,103 @@
+BAKE_OUTPUT_NODE_NAME = "Compify Bake Output"
+
+
+def ensure_bake_output(material):
+    """Ensures `material` has the minimal bake shader and returns its output node.
+
+    The bake shader is a white diffuse BSDF (transparent on back faces, like
+    the bake path of the Compify Footage group) wired to a material output
+    of its own. The footage, camera projection and reflection nodes aren't
+    connected to it, so Cycles skips them entirely while it is the active
+    output.
+    """
+    nodes = material.node_tree.nodes
+    if BAKE_OUTPUT_NODE_NAME in nodes:
+        return nodes[BAKE_OUTPUT_NODE_NAME]
+
+    # The active image node is the bake target, so keep it active.
+    active_node = nodes.active
+
+    # Create the nodes.
+    frame = nodes.new(type='NodeFrame')
+    geometry = nodes.new(type='ShaderNodeNewGeometry')
+    diffuse = nodes.new(type='ShaderNodeBsdfDiffuse')
+    transparent = nodes.new(type='ShaderNodeBsdfTransparent')
+    backfacing_mask = nodes.new(type='ShaderNodeMixShader')
+    output = nodes.new(type='ShaderNodeOutputMaterial')
+
+    # Label and name the nodes.
+    frame.label = "Compify Bake Shader"
+    frame.name = "Compify Bake Shader"
+    diffuse.label = "Bake Diffuse"
+    backfacing_mask.label = "Backfacing Mask"
+    output.label = BAKE_OUTPUT_NODE_NAME
+    output.name = BAKE_OUTPUT_NODE_NAME
+
+    # Put the nodes in their frame.
+    for node in (geometry, diffuse, transparent, backfacing_mask, output):
+        node.parent = frame
+
+    # Position the nodes, below everything else.
+    y = min((node.location.y for node in nodes if node.parent is None), default=0.0) - 400.0
+    hs = 200.0
+    x = 0.0
+    geometry.location = (x, y)
+    diffuse.location = (x, y - 200.0)
+    transparent.location = (x, y - 300.0)
+    x += hs
+    backfacing_mask.location = (x, y - 150.0)
+    x += hs
+    output.location = (x, y - 150.0)
+
+    # Configure the nodes.
+    diffuse.inputs['Color'].default_value = (1.0, 1.0, 1.0, 1.0)
+    diffuse.inputs['Roughness'].default_value = 0.0
+    transparent.inputs['Color'].default_value = (1.0, 1.0, 1.0, 1.0)
+    output.is_active_output = False
+
+    # Hook up the nodes.
+    links = material.node_tree.links
+    links.new(geometry.outputs['Backfacing'], backfacing_mask.inputs['Fac'])
+    links.new(diffuse.outputs['BSDF'], backfacing_mask.inputs[1])
+    links.new(transparent.outputs['BSDF'], backfacing_mask.inputs[2])
+    links.new(backfacing_mask.outputs['Shader'], output.inputs['Surface'])
+
+    nodes.active = active_node
+    return output
+
+
+def use_bake_outputs(materials):
+    """Makes the minimal bake shader the active output of each of `materials`.
+
+    Returns {material name: names of the previously active output nodes}
+    for restore_outputs().
+    """
+    previous = {}
+    for material in materials:
+        if material.node_tree is None:
+            continue
+        active = [node for node in material.node_tree.nodes
+                  if node.bl_idname == 'ShaderNodeOutputMaterial' and node.is_active_output]
+        bake_output = ensure_bake_output(material)
+        # Cycles prefers outputs targeting Cycles over ones targeting all
+        # engines, so match the target of the output being replaced.
+        bake_output.target = active[0].target if active else 'ALL'
+        bake_output.is_active_output = True
+        previous[material.name] = [node.name for node in active]
+    return previous
+
+
+def restore_outputs(materials, previous):
+    """Undoes use_bake_outputs()."""
+    for material in materials:
+        if material.name not in previous:
+            continue
+        nodes = material.node_tree.nodes
+        for name in previous[material.name]:
+            if name in nodes:
+                nodes[name].is_active_output = True
+        if BAKE_OUTPUT_NODE_NAME in nodes:
+            # An inactive output targeting all engines never wins over the
+            # material's own output, whatever that one targets.
+            nodes[BAKE_OUTPUT_NODE_NAME].is_active_output = False
+            nodes[BAKE_OUTPUT_NODE_NAME].target = 'ALL'
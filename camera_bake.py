@@ -0,0 +1,62 @@
+import os
+
+import bpy
+import numpy as np
+
+from .names import BAKE_IMAGE_NODE_NAME, UV_LAYER_NAME
+from .lighting_sequence import save_lighting_image
+
+
+def camera_bake_size(scene):
+    """Gets the (width, height) camera space lighting is rendered at."""
+    config = scene.compify_config
+    scale = config.camera_bake_percentage / 100.0
+    return (
+        max(1, int(scene.render.resolution_x * scale)),
+        max(1, int(scene.render.resolution_y * scale)),
+    )
+
+
+def setup_camera_render(bake_scene, scene, camera):
+    """Sets up the bake scene to render the lighting seen by `camera` at camera_bake_size()."""
+    bake_scene.camera = camera
+    render = bake_scene.render
+    render.resolution_x, render.resolution_y = camera_bake_size(scene)
+    render.resolution_percentage = 100
+    render.pixel_aspect_x = scene.render.pixel_aspect_x
+    render.pixel_aspect_y = scene.render.pixel_aspect_y
+    render.film_transparent = True
+    render.use_compositing = False
+    render.use_sequencer = False
+
+
+def load_render_result(bake_scene, image):
+    """Copies the bake scene's last render into `image`, which must be camera_bake_size()."""
+    path = os.path.join(bpy.app.tempdir, "compify_camera_bake.exr")
+    save_lighting_image(bake_scene, bpy.data.images['Render Result'], path)
+    rendered = bpy.data.images.load(path)
+    try:
+        pixels = np.empty(len(rendered.pixels), dtype=np.float32)
+        rendered.pixels.foreach_get(pixels)
+    finally:
+        bpy.data.images.remove(rendered)
+        os.remove(path)
+    image.pixels.foreach_set(pixels)
+    image.update()
+
+
+def link_lighting_vector(material, camera_space):
+    """Makes the Baked Lighting node of `material` look up lighting by camera projection or by the baking UVs."""
+    nodes = material.node_tree.nodes
+    if BAKE_IMAGE_NODE_NAME not in nodes or "Camera Project" not in nodes:
+        return
+    if camera_space:
+        source = nodes["Camera Project"].outputs['Vector']
+    else:
+        uv_maps = [node for node in nodes if node.bl_idname == 'ShaderNodeUVMap' and node.uv_map == UV_LAYER_NAME]
+        if len(uv_maps) == 0:
+            return
+        source = uv_maps[0].outputs['UV']
+    vector = nodes[BAKE_IMAGE_NODE_NAME].inputs['Vector']
+    if not (vector.is_linked and vector.links[0].from_socket == source):
+        material.node_tree.links.new(source, vector)
@@ -0,0 +1,205 @@
+"""Command line launcher for headless Compify renders.
+
+Run with a regular Python interpreter (not inside Blender):
+
+    python cli.py shot.blend --scene Shot --frames 1 240 --output /renders/shot_
+
+It starts `blender -b` on the file, loads this addon into it and runs
+headless.main(). The exit code is 0 on success, 1 if the bake or render
+failed and 2 for bad arguments.
+
+With `--workers N`, N background Blender processes are started on the same
+file. They claim frames one at a time from a shared queue of lock files
+(see frame_queue.py), so faster workers take on more frames, and all write
+into the same output path.
+
+`--pass bake` and `--pass render` run the two halves of a two-pass render
+separately, e.g. the bake pass on one set of machines and the render pass
+on another. `--pass two-pass` with `--workers` runs the bake pass on all
+workers, then the render pass.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from frame_queue import FrameQueue
+
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Loads this addon (from its own directory, unless Blender has already
+# enabled it) and hands the arguments after "--" to headless.main().
+BOOTSTRAP = (
+    "import sys, importlib, addon_utils; "
+    "sys.path.insert(0, {parent!r}); "
+    "addon_utils.enable({name!r}, default_set=False); "
+    "importlib.import_module({name!r} + '.headless').main()"
+)
+
+
+def blender_command(blender, blend_file, worker_args, threads=0):
+    """Builds the command line that runs headless.main() on `blend_file`."""
+    bootstrap = BOOTSTRAP.format(
+        parent=os.path.dirname(ADDON_DIR),
+        name=os.path.basename(ADDON_DIR),
+    )
+    thread_args = ["-t", str(threads)] if threads > 0 else []
+    return [
+        blender, "-b", blend_file, *thread_args,
+        "--python-exit-code", str(EXIT_FAILURE),
+        "--python-expr", bootstrap,
+        "--", *worker_args,
+    ]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="compify",
+        description="Bake and render a Compify scene with Blender in background mode.",
+    )
+    parser.add_argument("blend_file", help="The .blend file to render")
+    parser.add_argument("--scene", help="Scene to render (default: the file's active scene)")
+    parser.add_argument("--frames", nargs=2, type=int, metavar=("START", "END"),
+                        help="Frame range to render (default: the scene's range)")
+    parser.add_argument("--output", help="Output path prefix (default: the scene's output path)")
+    parser.add_argument("--prep", action="store_true", help="Run Prep Scene before rendering")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip frames the render manifest lists as done from the same inputs")
+    parser.add_argument("--pass", dest="passes", choices=("interleaved", "two-pass", "bake", "render"),
+                        help="Bake and render each frame (interleaved), bake the range to the lighting sequence "
+                             "first and then render against it (two-pass), or run one of those passes "
+                             "(default: the scene's Render Passes setting)")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"),
+                        help="Blender executable (default: $BLENDER or 'blender')")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of Blender processes sharing the frames (default: 1)")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="Render threads per worker (default: all cores split between the workers)")
+    parser.add_argument("--queue-dir",
+                        help="Directory for the shared frame queue (default: next to the output)")
+    return parser.parse_args(argv)
+
+
+def absolute_output_path(path):
+    """Makes an output prefix absolute, keeping blend-relative paths and trailing separators."""
+    if path.startswith("//"):
+        return path
+    trailing_sep = path.endswith(("/", os.sep))
+    return os.path.abspath(path) + (os.sep if trailing_sep else "")
+
+
+def worker_arguments(args, passes=None):
+    """Turns parsed launcher arguments back into headless.main() arguments."""
+    passes = passes or args.passes
+    worker_args = ["--pass", passes] if passes else []
+    if args.scene:
+        worker_args += ["--scene", args.scene]
+    if args.frames:
+        worker_args += ["--frames", str(args.frames[0]), str(args.frames[1])]
+    if args.output:
+        worker_args += ["--output", absolute_output_path(args.output)]
+    if args.prep:
+        worker_args.append("--prep")
+    if args.resume:
+        worker_args.append("--resume")
+    return worker_args
+
+
+def default_queue_dir(args):
+    if args.output and not args.output.startswith("//"):
+        return os.path.join(os.path.dirname(absolute_output_path(args.output)), ".compify_queue")
+    return tempfile.mkdtemp(prefix="compify_queue_")
+
+
+def print_worker_report(queue, elapsed):
+    """Prints per-worker and overall throughput of a finished multi-worker run."""
+    stats = queue.worker_stats()
+    print("compify: worker   frames   s/frame   frames/min")
+    total_frames = 0
+    for worker_id, info in sorted(stats.items()):
+        count = len(info["frames"])
+        total_frames += count
+        per_frame = info["elapsed"] / count if count else 0.0
+        per_minute = count * 60.0 / info["elapsed"] if info["elapsed"] > 0 else 0.0
+        print("compify: {:>6}   {:>6}   {:>7.2f}   {:>10.2f}".format(worker_id, count, per_frame, per_minute))
+    if elapsed > 0:
+        print("compify: total    {:>6}   {:>7.2f}   {:>10.2f}".format(
+            total_frames, elapsed / max(total_frames, 1), total_frames * 60.0 / elapsed))
+
+
+def run_workers(args, passes=None):
+    """Runs `args.workers` Blender processes on a shared frame queue."""
+    if (passes or args.passes) == "two-pass":
+        # Every frame's lighting has to be baked before any frame renders.
+        result = run_workers(args, "bake")
+        if result != EXIT_OK:
+            return result
+        return run_workers(args, "render")
+
+    queue_dir = args.queue_dir or default_queue_dir(args)
+    if passes:
+        queue_dir = os.path.join(queue_dir, passes)
+    queue = FrameQueue.create(queue_dir, args.frames[0], args.frames[1])
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+
+    base_args = worker_arguments(args, passes)
+    start_time = time.time()
+    processes = []
+    try:
+        for worker_id in range(args.workers):
+            worker_args = base_args + ["--queue", queue_dir, "--worker-id", str(worker_id)]
+            command = blender_command(args.blender, args.blend_file, worker_args, threads)
+            processes.append(subprocess.Popen(command))
+    except OSError as e:
+        print(f"compify: could not start Blender ({args.blender}): {e}", file=sys.stderr)
+        for process in processes:
+            process.terminate()
+        return EXIT_FAILURE
+    for process in processes:
+        process.wait()
+    elapsed = time.time() - start_time
+
+    print_worker_report(queue, elapsed)
+    done, failed, unfinished = queue.status()
+    if failed or unfinished:
+        print(f"compify: {len(done)} frames done, failed: {failed}, not rendered: {unfinished}",
+              file=sys.stderr)
+        return EXIT_FAILURE
+    return EXIT_OK
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if not os.path.isfile(args.blend_file):
+        print(f"compify: no such file: {args.blend_file}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.frames and args.frames[1] < args.frames[0]:
+        print(f"compify: empty frame range {args.frames[0]}-{args.frames[1]}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.workers < 1:
+        print("compify: --workers must be at least 1", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.workers > 1:
+        if not args.frames:
+            print("compify: --frames is required with --workers", file=sys.stderr)
+            return EXIT_USAGE
+        return run_workers(args)
+
+    command = blender_command(args.blender, args.blend_file, worker_arguments(args), args.threads)
+    try:
+        return subprocess.call(command)
+    except OSError as e:
+        print(f"compify: could not start Blender ({args.blender}): {e}", file=sys.stderr)
+        return EXIT_FAILURE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import os
+
+import bpy
+import numpy as np
+
+from .names import UV_LAYER_NAME, compify_denoise_scene_name
+from .uv_utils import uv_coverage, shifted
+from .bake_cache import bake_objects_and_lights
+from .lighting_sequence import save_lighting_image
+
+
+# Rec. 709 luminance weights.
+LUMA = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+# Number of à-trous passes of the edge-aware filter. Each doubles the
+# filter's reach, so this covers a 15 texel wide neighbourhood.
+FILTER_PASSES = 3
+
+
+def edge_aware_filter(rgb, island, strength):
+    """Denoises baked lighting with an edge-avoiding à-trous filter.
+
+    `rgb` is a (rows, columns, 3) array and `island` the matching UV island
+    number of each texel (0 for uncovered texels). Texels only gather from
+    texels of the same UV island, so lighting never bleeds across island
+    borders, which are discontinuities on the surface. Neighbours whose
+    brightness differs by more than about `strength` (relative) are
+    weighted down, which keeps shadow edges sharp.
+    """
+    kernel = (0.25, 0.5, 0.25)
+    covered = island > 0
+    for i in range(FILTER_PASSES):
+        step = 1 << i
+        luma = rgb @ LUMA
+        total = np.zeros_like(rgb)
+        weights = np.zeros(island.shape, dtype=np.float32)
+        for ky, wy in zip((-1, 0, 1), kernel):
+            for kx, wx in zip((-1, 0, 1), kernel):
+                other_rgb = shifted(rgb, ky * step, kx * step, 0.0)
+                other_luma = shifted(luma, ky * step, kx * step, 0.0)
+                same_island = shifted(island, ky * step, kx * step, 0) == island
+                scale = strength * np.maximum(np.maximum(luma, other_luma), 1e-6)
+                w = wy * wx * same_island * np.exp(-np.abs(other_luma - luma) / scale)
+                total += other_rgb * w[..., None]
+                weights += w
+        filtered = total / np.maximum(weights, 1e-12)[..., None]
+        rgb = np.where(covered[..., None], filtered, rgb)
+    return rgb
+
+
+def _denoise_filter(context, pixels, size):
+    config = context.scene.compify_config
+    if config.bake_space == 'CAMERA':
+        # A camera space bake is one continuous image.
+        island = np.ones((size[1], size[0]), dtype=np.int32)
+    else:
+        objects, _ = bake_objects_and_lights(config)
+        island = uv_coverage(objects, UV_LAYER_NAME, size[0]).island
+    rgba = pixels.reshape(size[1], size[0], 4)
+    rgba[..., :3] = edge_aware_filter(rgba[..., :3], island, config.bake_denoise_strength)
+    return pixels
+
+
+def _denoise_compositor(context, image):
+    """Runs `image` through the compositor's Denoise node in a temporary scene.
+
+    Returns the denoised pixels, or None if the compositor couldn't run.
+    """
+    scene = bpy.data.scenes.new(compify_denoise_scene_name(context))
+    path = os.path.join(bpy.app.tempdir, "compify_denoise.exr")
+    tree = None
+    try:
+        # Nothing but the compositor runs, so the render engine is the cheapest.
+        scene.render.engine = 'BLENDER_WORKBENCH'
+        scene.render.resolution_x, scene.render.resolution_y = image.size
+        scene.render.resolution_percentage = 100
+        scene.render.use_compositing = True
+        scene.render.use_sequencer = False
+        camera = context.scene.compify_config.camera or context.scene.camera
+        if camera is not None:
+            scene.collection.objects.link(camera)
+            scene.camera = camera
+
+        if hasattr(scene, "compositing_node_group"):
+            # Blender 5.0+: the compositor is a node group with a group output.
+            tree = bpy.data.node_groups.new(scene.name, 'CompositorNodeTree')
+            tree.interface.new_socket("Image", in_out='OUTPUT', socket_type='NodeSocketColor')
+            scene.compositing_node_group = tree
+            output = tree.nodes.new(type='NodeGroupOutput')
+        else:
+            scene.use_nodes = True
+            tree = scene.node_tree
+            tree.nodes.clear()
+            output = tree.nodes.new(type='CompositorNodeComposite')
+        image_node = tree.nodes.new(type='CompositorNodeImage')
+        image_node.image = image
+        denoise = tree.nodes.new(type='CompositorNodeDenoise')
+        if hasattr(denoise, "use_hdr"):
+            denoise.use_hdr = True
+        elif "HDR" in denoise.inputs:
+            denoise.inputs["HDR"].default_value = True
+        tree.links.new(image_node.outputs["Image"], denoise.inputs["Image"])
+        tree.links.new(denoise.outputs["Image"], output.inputs[0])
+
+        if 'CANCELLED' in bpy.ops.render.render('EXEC_DEFAULT', scene=scene.name):
+            return None
+        save_lighting_image(scene, bpy.data.images['Render Result'], path)
+        denoised = bpy.data.images.load(path)
+        try:
+            pixels = np.empty(len(denoised.pixels), dtype=np.float32)
+            denoised.pixels.foreach_get(pixels)
+        finally:
+            bpy.data.images.remove(denoised)
+        return pixels
+    finally:
+        if tree is not None and hasattr(scene, "compositing_node_group"):
+            bpy.data.node_groups.remove(tree)
+        bpy.data.scenes.remove(scene)
+        if os.path.isfile(path):
+            os.remove(path)
+
+
+def denoise_bake_image(context, image, objects=None):
+    """Denoises the baked lighting in `image` with the configured denoiser.
+
+    Only the texels of `objects` are changed if given, so lighting that was
+    already denoised by an earlier bake isn't filtered again.
+    """
+    denoiser = context.scene.compify_config.bake_denoiser
+    if denoiser == 'NONE' or (objects is not None and len(objects) == 0):
+        return
+    pixels = np.empty(len(image.pixels), dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+
+    if denoiser == 'COMPOSITOR':
+        denoised = _denoise_compositor(context, image)
+        if denoised is None:
+            print("Compositor denoise failed, keeping the noisy bake")
+            return
+    else:
+        denoised = _denoise_filter(context, pixels.copy(), image.size)
+
+    if objects is not None:
+        bake_objects, _ = bake_objects_and_lights(context.scene.compify_config)
+        mask = uv_coverage(bake_objects, UV_LAYER_NAME, image.size[0]).object_mask(objects)
+        denoised = np.where(mask.reshape(-1, 1), denoised.reshape(-1, 4), pixels.reshape(-1, 4)).ravel()
+    image.pixels.foreach_set(denoised)
+    image.update()
@@ -0,0 +1,27 @@
+import numpy as np
+
+from .names import UV_LAYER_NAME
+from .uv_utils import uv_coverage
+from .bake_cache import bake_objects_and_lights
+
+
+def dilate_bake_image(context, image):
+    """Fills the UV margins of the baked lighting in `image`, in place of a Cycles bake margin.
+
+    Every uncovered texel within Bake UV Margin texels of a UV island
+    takes the lighting of the nearest covered texel. Which texel that is
+    only depends on the UVs, so it is worked out once and reused until the
+    UVs change.
+    """
+    config = context.scene.compify_config
+    if config.bake_uv_margin <= 0:
+        return
+    objects, _ = bake_objects_and_lights(config)
+    coverage = uv_coverage(objects, UV_LAYER_NAME, image.size[0])
+    targets, sources = coverage.margin_texels(config.bake_uv_margin)
+    pixels = np.empty(len(image.pixels), dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    rgba = pixels.reshape(-1, 4)
+    rgba[targets] = rgba[sources]
+    image.pixels.foreach_set(pixels)
+    image.update()
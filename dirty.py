@@ -0,0 +1,144 @@
+import hashlib
+import math
+
+import numpy as np
+
+from .bake_cache import hash_shared_inputs, hash_light, hash_world, bake_objects_and_lights, geo_digests
+
+
+def world_bounds(obj_eval):
+    """Returns the (min, max) corners of an evaluated object's world space bounding box."""
+    matrix = np.array(obj_eval.matrix_world, dtype=np.float64)
+    corners = np.array([tuple(c) for c in obj_eval.bound_box], dtype=np.float64)
+    corners = corners @ matrix[:3, :3].T + matrix[:3, 3]
+    return corners.min(axis=0), corners.max(axis=0)
+
+
+def light_influence_radius(obj_eval, cutoff):
+    """Estimates how far a light's direct light reaches before falling below `cutoff` (W/m²).
+
+    Sun lights, node-driven lights and emissive meshes reach everything
+    (infinite radius). Custom Distance is ignored: it only clips lights in
+    EEVEE, and bakes run in Cycles.
+    """
+    if obj_eval.type != 'LIGHT':
+        return math.inf
+    light = obj_eval.data
+    if light.type == 'SUN' or light.use_nodes:
+        return math.inf
+    if cutoff <= 0.0:
+        return math.inf
+    power = light.energy * max(light.color)
+    return math.sqrt(max(power, 0.0) / (4.0 * math.pi * cutoff))
+
+
+def light_extent(light):
+    """Gets the radius of a light's emitting surface, which its light starts out from.
+
+    For area lights that is half the diagonal of the light.
+    """
+    if light.type == 'AREA':
+        size_y = light.size_y if light.shape in {'RECTANGLE', 'ELLIPSE'} else light.size
+        return 0.5 * math.hypot(light.size, size_y)
+    return getattr(light, "shadow_soft_size", 0.0)
+
+
+def box_distances(point, mins, maxs):
+    """Distances from `point` to each of the boxes given by `mins` and `maxs`."""
+    return np.linalg.norm(np.maximum(np.maximum(mins - point, point - maxs), 0.0), axis=1)
+
+
+def object_lighting_keys(context, objects, digests=None):
+    """Gets {object name: key} for the lighting each of `objects` would be baked with now.
+
+    An object's key only covers what can plausibly change its lighting:
+    the bake settings, footage and world; its own transform and geometry;
+    every light whose influence radius reaches its bounds; every bake
+    object within Bounce Distance of it; and every bake object lit by a
+    light that also reaches it, since that object can shadow it. So a
+    light moving around one corner of a set leaves the keys of distant
+    objects, and with them their baked texels, alone. `digests` are the
+    frame's geo_digests(), if already computed.
+    """
+    scene = context.scene
+    config = scene.compify_config
+    depsgraph = context.evaluated_depsgraph_get()
+
+    h = hashlib.sha1()
+    hash_shared_inputs(h, context, depsgraph, camera=False)
+    hash_world(h, scene, depsgraph)
+    shared = h.digest()
+
+    # Every bake object can shadow or bounce onto the ones being keyed.
+    bake_objects, lights = bake_objects_and_lights(config)
+    geo = sorted((obj.evaluated_get(depsgraph) for obj in bake_objects), key=lambda o: o.name)
+    if len(geo) == 0:
+        return {}
+    geo_index = {obj.name: i for i, obj in enumerate(geo)}
+    if digests is None:
+        digests = geo_digests(context)
+    object_digests = [digests[obj_eval.name] for obj_eval in geo]
+    bounds = [world_bounds(obj_eval) for obj_eval in geo]
+    mins = np.array([b[0] for b in bounds])
+    maxs = np.array([b[1] for b in bounds])
+
+    # Which bake objects each light reaches. A light is keyed in its
+    # influenced objects by its state plus the state of everything it lights.
+    light_digests = []
+    light_reach = []
+    for obj in sorted(lights, key=lambda o: o.name):
+        obj_eval = obj.evaluated_get(depsgraph)
+        radius = light_influence_radius(obj_eval, config.light_influence_cutoff)
+        if math.isinf(radius):
+            reach = np.ones(len(geo), dtype=bool)
+        else:
+            position = np.array(obj_eval.matrix_world.translation, dtype=np.float64)
+            reach = box_distances(position, mins, maxs) <= radius + light_extent(obj_eval.data)
+        h = hashlib.sha1()
+        hash_light(h, obj_eval)
+        h.update(np.float64(radius).tobytes())
+        for i in np.flatnonzero(reach):
+            h.update(object_digests[i])
+        light_digests.append(h.digest())
+        light_reach.append(reach)
+
+    keys = {}
+    margin = config.bounce_distance
+    for obj in objects:
+        i = geo_index.get(obj.name)
+        if i is None:
+            continue
+        h = hashlib.sha1(shared)
+        h.update(object_digests[i])
+        for digest, reach in zip(light_digests, light_reach):
+            if reach[i]:
+                h.update(digest)
+        # Nearby objects, for bounce light and contact shadows.
+        near = np.all((mins <= maxs[i] + margin) & (maxs >= mins[i] - margin), axis=1)
+        for j in np.flatnonzero(near):
+            h.update(object_digests[j])
+        keys[obj.name] = h.hexdigest()
+    return keys
+
+
+class BakedKeys:
+    """Remembers which object lighting keys the bake image holds, for partial rebakes."""
+    def __init__(self):
+        self.baked = {}  # Object name -> lighting key its texels were last baked with
+        self.pending = {}  # Lighting keys of the objects in the running bake
+
+    def stale(self, objects, keys):
+        """Gets the `objects` whose texels don't hold their lighting `keys` yet."""
+        self.pending = keys
+        return [obj for obj in objects if obj.name not in keys or self.baked.get(obj.name) != keys[obj.name]]
+
+    def commit(self, objects):
+        """Records that `objects` now hold the lighting of the running bake."""
+        for obj in objects:
+            if obj.name in self.pending:
+                self.baked[obj.name] = self.pending[obj.name]
+        self.pending = {}
+
+    def clear(self):
+        """Forgets what is in the bake image, after something other than a bake wrote to it."""
+        self.baked = {}
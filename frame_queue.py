@@ -0,0 +1,108 @@
+"""Frame queue shared by several Blender workers through lock files.
+
+This module must not import bpy or use relative imports: it's used both by
+cli.py, running in a plain Python interpreter, and by headless.py inside
+the Blender workers.
+
+Each frame is claimed by atomically creating `<frame>.lock` in the queue
+directory, so a worker that renders faster simply claims more frames. A
+finished frame gets a `<frame>.done` marker and a failed one a
+`<frame>.failed` marker; a `.lock` without either belongs to a worker that
+is still on it (or died on it).
+"""
+import json
+import os
+import socket
+import time
+
+
+QUEUE_FILE = "queue.json"
+
+
+def _marker(queue_dir, frame, kind):
+    return os.path.join(queue_dir, "{:06}.{}".format(frame, kind))
+
+
+class FrameQueue:
+    def __init__(self, queue_dir):
+        self.queue_dir = queue_dir
+        with open(os.path.join(queue_dir, QUEUE_FILE)) as f:
+            info = json.load(f)
+        self.frame_start = info["frame_start"]
+        self.frame_end = info["frame_end"]
+
+    @classmethod
+    def create(cls, queue_dir, frame_start, frame_end):
+        """Creates a queue for the frame range, clearing any claims from earlier runs."""
+        os.makedirs(queue_dir, exist_ok=True)
+        for name in os.listdir(queue_dir):
+            if name.endswith((".lock", ".done", ".failed")) or name.startswith("worker_"):
+                os.remove(os.path.join(queue_dir, name))
+        with open(os.path.join(queue_dir, QUEUE_FILE), "w") as f:
+            json.dump({"frame_start": frame_start, "frame_end": frame_end}, f)
+        return cls(queue_dir)
+
+    def frames(self):
+        return range(self.frame_start, self.frame_end + 1)
+
+    def claim(self, worker_id, after=None):
+        """Claims the first unclaimed frame (after `after`), or returns None if there is none left."""
+        start = self.frame_start if after is None else after + 1
+        for frame in range(start, self.frame_end + 1):
+            try:
+                fd = os.open(_marker(self.queue_dir, frame, "lock"), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            with os.fdopen(fd, "w") as f:
+                json.dump({"worker": worker_id, "host": socket.gethostname(),
+                           "pid": os.getpid(), "time": time.time()}, f)
+            return frame
+        return None
+
+    def complete(self, frame):
+        open(_marker(self.queue_dir, frame, "done"), "w").close()
+
+    def fail(self, frame, reason):
+        with open(_marker(self.queue_dir, frame, "failed"), "w") as f:
+            f.write(reason)
+
+    def claims(self, worker_id):
+        """Yields frames as they are claimed.
+
+        A frame is marked done when the next one is requested, i.e. once the
+        consumer has finished with it; if the consumer stops early, the frame
+        it was working on stays claimed but not done.
+        """
+        frame = None
+        while True:
+            frame = self.claim(worker_id, after=frame)
+            if frame is None:
+                return
+            yield frame
+            self.complete(frame)
+
+    def status(self):
+        """Returns (done, failed, unfinished) frame lists."""
+        done, failed, unfinished = [], [], []
+        for frame in self.frames():
+            if os.path.exists(_marker(self.queue_dir, frame, "done")):
+                done.append(frame)
+            elif os.path.exists(_marker(self.queue_dir, frame, "failed")):
+                failed.append(frame)
+            else:
+                unfinished.append(frame)
+        return done, failed, unfinished
+
+    def write_worker_stats(self, worker_id, stats):
+        path = os.path.join(self.queue_dir, "worker_{}.json".format(worker_id))
+        with open(path, "w") as f:
+            json.dump(stats, f, indent=2)
+
+    def worker_stats(self):
+        stats = {}
+        for name in sorted(os.listdir(self.queue_dir)):
+            if name.startswith("worker_") and name.endswith(".json"):
+                with open(os.path.join(self.queue_dir, name)) as f:
+                    info = json.load(f)
+                stats[info["worker"]] = info
+        return stats
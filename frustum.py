@@ -0,0 +1,54 @@
+from mathutils import Vector
+
+
+def _frustum_planes(scene, camera, margin):
+    """Gets the camera's view frustum as inward-facing (normal, offset) planes in camera space.
+
+    `margin` widens the frustum on every side by that fraction of the frame
+    size.
+    """
+    cam = camera.data
+    frame = list(cam.view_frame(scene=scene))  # Corners at z = -distance.
+    center = sum(frame, Vector()) / 4.0
+    frame = [center + (v - center) * (1.0 + 2.0 * margin) for v in frame]
+    planes = []
+    if cam.type == 'ORTHO':
+        xs = [v.x for v in frame]
+        ys = [v.y for v in frame]
+        planes += [
+            (Vector((1.0, 0.0, 0.0)), -min(xs)),
+            (Vector((-1.0, 0.0, 0.0)), max(xs)),
+            (Vector((0.0, 1.0, 0.0)), -min(ys)),
+            (Vector((0.0, -1.0, 0.0)), max(ys)),
+        ]
+    else:
+        # Side planes through the camera origin and each frame edge.
+        for a, b in zip(frame, frame[1:] + frame[:1]):
+            normal = a.cross(b).normalized()
+            if normal.dot(center) < 0.0:
+                normal.negate()
+            planes.append((normal, 0.0))
+    # Near and far clipping.
+    planes.append((Vector((0.0, 0.0, -1.0)), -cam.clip_start))
+    planes.append((Vector((0.0, 0.0, 1.0)), cam.clip_end))
+    return planes
+
+
+def objects_in_view(scene, camera, objects, depsgraph, margin=0.0):
+    """Returns the objects whose evaluated bounding boxes touch the camera's view frustum.
+
+    This is conservative: an object is only dropped when all corners of its
+    bounding box lie outside the same frustum plane.
+    """
+    camera_eval = camera.evaluated_get(depsgraph)
+    planes = _frustum_planes(scene, camera_eval, margin)
+    world_to_camera = camera_eval.matrix_world.inverted()
+
+    visible = []
+    for obj in objects:
+        obj_eval = obj.evaluated_get(depsgraph)
+        to_camera = world_to_camera @ obj_eval.matrix_world
+        corners = [to_camera @ Vector(corner) for corner in obj_eval.bound_box]
+        if not any(all(normal.dot(co) + offset < 0.0 for co in corners) for normal, offset in planes):
+            visible.append(obj)
+    return visible
@@ -0,0 +1,226 @@
+"""Synchronous Compify API for scripts and background (`blender -b`) renders.
+
+Unlike the operators in the Compify panel, nothing here needs a window,
+modal handler or timer: bakes and renders run with EXEC_DEFAULT and every
+call returns once its work is done. Failures raise `RuntimeError`.
+
+From inside Blender, `main()` runs a render from command line arguments,
+e.g. `blender -b shot.blend --python-expr "..." -- --frames 1 100`. See
+cli.py for a launcher that builds that command line.
+"""
+import argparse
+import sys
+import time
+from contextlib import contextmanager
+
+import bpy
+
+from . import FramePipeline, compify_mat_name
+from .frame_queue import FrameQueue
+from .lighting_sequence import RENDER_PASSES
+
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+
+
+@contextmanager
+def scene_context(scene, view_layer=None):
+    """Yields a context in which `scene` and its view layer are active."""
+    if view_layer is None:
+        view_layer = scene.view_layers[0]
+    with bpy.context.temp_override(scene=scene, view_layer=view_layer):
+        yield bpy.context
+
+
+def _check_scene(scene, need_material=True):
+    config = scene.compify_config
+    if config.footage is None:
+        raise RuntimeError(f"Scene \"{scene.name}\" has no Compify footage set")
+    if config.camera is None:
+        raise RuntimeError(f"Scene \"{scene.name}\" has no Compify camera set")
+    if config.geo_collection is None or len(config.geo_collection.all_objects) == 0:
+        raise RuntimeError(f"Scene \"{scene.name}\" has no Compify footage geo")
+    if need_material:
+        with scene_context(scene) as context:
+            if compify_mat_name(context) not in bpy.data.materials:
+                raise RuntimeError(f"Scene \"{scene.name}\" hasn't been prepped for Compify")
+
+
+def prep_scene(scene):
+    """Runs Prep Scene (materials, UVs and reflections) on `scene`."""
+    _check_scene(scene, need_material=False)
+    with scene_context(scene):
+        result = bpy.ops.material.compify_prep_scene()
+    if 'FINISHED' not in result:
+        raise RuntimeError(f"Prep Scene failed for \"{scene.name}\"")
+
+
+def bake_lighting(scene, frame=None):
+    """Bakes the footage lighting of `scene` at `frame` (default: the current frame)."""
+    _check_scene(scene)
+    with scene_context(scene) as context:
+        if frame is not None:
+            scene.frame_set(frame)
+        frame = scene.frame_current
+        pipeline = FramePipeline(context, frame, frame, render=False, blocking=True)
+        pipeline.start(context)
+    if pipeline.is_cancelled:
+        raise RuntimeError(pipeline.error or f"Bake of frame {frame} was cancelled")
+    return pipeline
+
+
+def _lighting_passes(scene, passes):
+    if passes is None:
+        passes = scene.compify_config.render_passes
+    if passes not in RENDER_PASSES:
+        raise RuntimeError(f"Unknown render passes \"{passes}\"")
+    return RENDER_PASSES[passes]
+
+
+def render_range(scene, frame_start=None, frame_end=None, output=None, resume=None, passes=None):
+    """Bakes and renders every frame of `scene` in the range, like Render with Compify.
+
+    `output` overrides the scene's output path for this call, `resume` the
+    scene's Resume Render setting and `passes` its Render Passes setting
+    ('INTERLEAVED', 'TWO_PASS', 'BAKE' or 'RENDER'). Returns the finished
+    FramePipeline of the last pass, whose `clock` holds the per-frame stage
+    timings.
+    """
+    _check_scene(scene)
+    lighting_passes = _lighting_passes(scene, passes)
+    if frame_start is None:
+        frame_start = scene.frame_start
+    if frame_end is None:
+        frame_end = scene.frame_end
+    if frame_end < frame_start:
+        raise RuntimeError(f"Empty frame range {frame_start}-{frame_end}")
+
+    old_output = scene.render.filepath
+    if output is not None:
+        scene.render.filepath = output
+    try:
+        with scene_context(scene) as context:
+            for lighting_pass in lighting_passes:
+                pipeline = FramePipeline(
+                    context, frame_start, frame_end,
+                    blocking=True, resume=resume, lighting_pass=lighting_pass,
+                )
+                pipeline.start(context)
+                if pipeline.is_cancelled:
+                    break
+    finally:
+        scene.render.filepath = old_output
+    if pipeline.is_cancelled:
+        raise RuntimeError(pipeline.error or "Render was cancelled")
+    return pipeline
+
+
+def run_worker(scene, queue_dir, worker_id, output=None, resume=None, passes=None):
+    """Renders frames claimed from the shared queue in `queue_dir` until none are left.
+
+    Several workers (separate Blender processes) can run on the same queue;
+    each one bakes and renders its claimed frames exactly like render_range().
+    Per-worker throughput is written to the queue directory. A queue covers
+    a single pass, so 'TWO_PASS' needs one queue for the bake pass and
+    another for the render pass.
+    """
+    _check_scene(scene)
+    lighting_passes = _lighting_passes(scene, passes)
+    if len(lighting_passes) != 1:
+        raise RuntimeError("A frame queue runs one pass at a time: use the 'BAKE' and then the 'RENDER' passes")
+    queue = FrameQueue(queue_dir)
+
+    old_output = scene.render.filepath
+    if output is not None:
+        scene.render.filepath = output
+    start_time = time.time()
+    try:
+        with scene_context(scene) as context:
+            # Static lighting is judged over the whole queue, not just the
+            # frames this worker happens to claim.
+            pipeline = FramePipeline(
+                context, queue.frame_start, queue.frame_end,
+                blocking=True, frames=queue.claims(worker_id), resume=resume,
+                lighting_pass=lighting_passes[0], worker_id=worker_id,
+            )
+            pipeline.start(context)
+    finally:
+        scene.render.filepath = old_output
+
+    frames = pipeline.clock.frames
+    if pipeline.is_cancelled:
+        queue.fail(scene.frame_current, pipeline.error or "cancelled")
+    queue.write_worker_stats(worker_id, {
+        "worker": worker_id,
+        "frames": [f["frame"] for f in frames],
+        "elapsed": time.time() - start_time,
+        "timings": frames,
+        "error": pipeline.error,
+    })
+    if pipeline.is_cancelled:
+        raise RuntimeError(pipeline.error or f"Frame {scene.frame_current} was cancelled")
+    return pipeline
+
+
+# --pass values and the Render Passes they select.
+PASS_ARGUMENTS = {
+    "interleaved": 'INTERLEAVED',
+    "two-pass": 'TWO_PASS',
+    "bake": 'BAKE',
+    "render": 'RENDER',
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="compify",
+        description="Bake and render a Compify scene in the current Blender session.",
+    )
+    parser.add_argument("--scene", help="Scene to render (default: the file's active scene)")
+    parser.add_argument("--frames", nargs=2, type=int, metavar=("START", "END"),
+                        help="Frame range to render (default: the scene's range)")
+    parser.add_argument("--output", help="Output path prefix (default: the scene's output path)")
+    parser.add_argument("--prep", action="store_true", help="Run Prep Scene before rendering")
+    parser.add_argument("--resume", action="store_true", default=None,
+                        help="Skip frames the render manifest lists as done from the same inputs")
+    parser.add_argument("--pass", dest="passes", choices=PASS_ARGUMENTS,
+                        help="interleaved: bake and render each frame; two-pass: bake the range to the lighting "
+                             "sequence, then render against it; bake/render: run just one of those passes "
+                             "(default: the scene's Render Passes setting)")
+    parser.add_argument("--queue", help="Claim frames from this shared frame queue directory instead of --frames")
+    parser.add_argument("--worker-id", default="0", help="Name of this worker in the frame queue")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point. Exits Blender with an EXIT_* code."""
+    if argv is None:
+        # Blender's own arguments end at "--".
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    args = parse_args(argv)
+
+    if args.scene is None:
+        scene = bpy.context.scene
+    elif args.scene in bpy.data.scenes:
+        scene = bpy.data.scenes[args.scene]
+    else:
+        print(f"Compify: no scene named \"{args.scene}\"", file=sys.stderr)
+        sys.exit(EXIT_USAGE)
+
+    frame_start, frame_end = args.frames if args.frames else (None, None)
+    passes = PASS_ARGUMENTS[args.passes] if args.passes else None
+    try:
+        if args.prep:
+            prep_scene(scene)
+        if args.queue:
+            pipeline = run_worker(scene, args.queue, args.worker_id, args.output, args.resume, passes)
+        else:
+            pipeline = render_range(scene, frame_start, frame_end, args.output, args.resume, passes)
+    except RuntimeError as e:
+        print(f"Compify: {e}", file=sys.stderr)
+        sys.exit(EXIT_FAILURE)
+
+    print("Compify: render finished. " + pipeline.clock.summary())
+    sys.exit(EXIT_OK)
@@ -0,0 +1,66 @@
+import math
+
+import numpy as np
+
+from .dirty import light_influence_radius, light_extent, world_bounds, box_distances
+
+
+def _box_corners(mins, maxs):
+    """Gets the (boxes, 8, 3) corners of the boxes given by `mins` and `maxs`."""
+    select = np.array([[(i >> axis) & 1 for axis in range(3)] for i in range(8)], dtype=bool)
+    return np.where(select[None], maxs[:, None], mins[:, None])
+
+
+def light_reaches(obj_eval, mins, maxs, cutoff):
+    """Returns a boolean array of which of the boxes given by `mins` and `maxs` a light can light.
+
+    This is conservative: a box is only ruled out when it is beyond the
+    light's influence radius, outside a spot light's cone, or behind an
+    area light.
+    """
+    count = len(mins)
+    if obj_eval.type != 'LIGHT':
+        return np.ones(count, dtype=bool)
+    light = obj_eval.data
+    radius = light_influence_radius(obj_eval, cutoff)
+    if math.isinf(radius):
+        return np.ones(count, dtype=bool)
+
+    matrix = np.array(obj_eval.matrix_world, dtype=np.float64)
+    position = matrix[:3, 3]
+    # Light emitting surfaces have a size, so their light starts out that far.
+    reach = box_distances(position, mins, maxs) <= radius + light_extent(light)
+
+    direction = -matrix[:3, 2]
+    direction /= max(np.linalg.norm(direction), 1e-12)
+    if light.type == 'SPOT' and not light.use_nodes:
+        # Test the boxes' bounding spheres against the cone.
+        centers = (mins + maxs) * 0.5
+        radii = np.linalg.norm(maxs - mins, axis=1) * 0.5 + light.shadow_soft_size
+        offsets = centers - position
+        distances = np.linalg.norm(offsets, axis=1)
+        inside = distances <= radii
+        cos_angle = np.clip((offsets @ direction) / np.maximum(distances, 1e-12), -1.0, 1.0)
+        sphere_angle = np.arcsin(np.clip(radii / np.maximum(distances, 1e-12), 0.0, 1.0))
+        reach &= inside | (np.arccos(cos_angle) - sphere_angle <= light.spot_size * 0.5)
+    elif light.type == 'AREA':
+        # Area lights only emit from their front (-Z) side.
+        corners = _box_corners(mins, maxs)
+        reach &= np.max((corners - position) @ direction, axis=1) >= 0.0
+    return reach
+
+
+def contributing_lights(context, bake_objects, lights):
+    """Returns the `lights` that can light any of `bake_objects` in the current frame."""
+    depsgraph = context.evaluated_depsgraph_get()
+    cutoff = context.scene.compify_config.light_influence_cutoff
+    geo = [obj.evaluated_get(depsgraph) for obj in bake_objects if obj.type == 'MESH']
+    if len(geo) == 0:
+        return []
+    bounds = [world_bounds(obj_eval) for obj_eval in geo]
+    mins = np.array([b[0] for b in bounds])
+    maxs = np.array([b[1] for b in bounds])
+    return [
+        obj for obj in lights
+        if np.any(light_reaches(obj.evaluated_get(depsgraph), mins, maxs, cutoff))
+    ]
@@ -0,0 +1,62 @@
+import os
+
+import bpy
+
+
+# Passes run for each Render Passes setting. None is the interleaved
+# bake-then-render loop, 'BAKE' bakes the range to the lighting sequence and
+# 'RENDER' renders the range against it.
+RENDER_PASSES = {
+    'INTERLEAVED': (None,),
+    'TWO_PASS': ('BAKE', 'RENDER'),
+    'BAKE': ('BAKE',),
+    'RENDER': ('RENDER',),
+}
+
+
+def lighting_sequence_prefix(scene):
+    """Gets the absolute path prefix of the scene's baked lighting sequence."""
+    return bpy.path.abspath(scene.compify_config.lighting_sequence_path)
+
+
+def lighting_frame_path(prefix, frame):
+    return "{}{:04}.exr".format(prefix, frame)
+
+
+def save_lighting_image(scene, image, path, half=False, codec='ZIP'):
+    """Saves the baked lighting `image` to `path` as an OpenEXR.
+
+    `half` saves half floats instead of full floats, and `codec` is the EXR
+    compression.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    settings = scene.render.image_settings
+    old_format = settings.file_format
+    old_depth = settings.color_depth
+    old_codec = settings.exr_codec
+    try:
+        settings.file_format = 'OPEN_EXR'
+        settings.color_depth = '16' if half else '32'
+        settings.exr_codec = codec
+        image.save_render(filepath=path, scene=scene)
+    finally:
+        # The format goes back first, as the valid color depths depend on it.
+        settings.file_format = old_format
+        settings.exr_codec = old_codec
+        settings.color_depth = old_depth
+
+
+def load_lighting_sequence(scene, frame_start):
+    """Loads the scene's baked lighting sequence as an image sequence.
+
+    Returns the image, or None if the sequence has no file for `frame_start`.
+    """
+    path = lighting_frame_path(lighting_sequence_prefix(scene), frame_start)
+    if not os.path.isfile(path):
+        return None
+    image = bpy.data.images.load(path, check_existing=True)
+    image.source = 'SEQUENCE'
+    image.reload()
+    return image
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+
+
+# Rec. 709 luminance weights.
+LUMA = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+# Largest finite half float.
+HALF_MAX = 65504.0
+
+# Approximate bytes per texel of baked lighting held in each storage mode.
+TEXEL_BYTES = {
+    'FLOAT': 16.0,
+    'HALF': 8.0,
+    'LUMA_CHROMA': 2.0 + 6.0 / 4.0,  # Half float luminance, plus half float chroma per 2x2 texels.
+}
+
+# Path and size in bytes of the last baked lighting file written.
+last_saved = {"path": None, "size": 0}
+
+
+def _half(a):
+    return np.clip(a, -HALF_MAX, HALF_MAX).astype(np.float16)
+
+
+def pack(pixels, width, storage):
+    """Packs flat RGBA float32 `pixels` into a dict of arrays in the given storage mode.
+
+    'FLOAT' keeps them as they are and 'HALF' converts them to half floats.
+    'LUMA_CHROMA' keeps luminance at full resolution and color (RGB over
+    luminance) at half resolution, both as half floats. Lighting color
+    changes slowly across a surface, so little is lost.
+    """
+    if storage == 'FLOAT':
+        return {"rgba": pixels}
+    if storage == 'HALF':
+        return {"rgba": _half(pixels)}
+
+    rgb = pixels.reshape(-1, width, 4)[..., :3]
+    height = rgb.shape[0]
+    luma = rgb @ LUMA
+    # Luminance weighted chroma of each 2x2 block, so uncovered (black)
+    # texels don't darken the color of their covered neighbours.
+    padded_rgb = np.pad(rgb, ((0, height % 2), (0, width % 2), (0, 0)), mode='edge')
+    padded_luma = np.pad(luma, ((0, height % 2), (0, width % 2)), mode='edge')
+    block_rgb = padded_rgb.reshape(padded_rgb.shape[0] // 2, 2, padded_rgb.shape[1] // 2, 2, 3).sum(axis=(1, 3))
+    block_luma = padded_luma.reshape(padded_luma.shape[0] // 2, 2, padded_luma.shape[1] // 2, 2).sum(axis=(1, 3))
+    chroma = np.ones_like(block_rgb)
+    lit = block_luma > 0.0
+    chroma[lit] = block_rgb[lit] / block_luma[lit][:, None]
+    return {"luma": _half(luma), "chroma": _half(chroma)}
+
+
+def unpack(packed):
+    """Gets the flat RGBA float32 pixels of pack()ed lighting."""
+    if "rgba" in packed:
+        return packed["rgba"].astype(np.float32, copy=False)
+    luma = packed["luma"].astype(np.float32)
+    height, width = luma.shape
+    chroma = np.repeat(np.repeat(packed["chroma"].astype(np.float32), 2, axis=0), 2, axis=1)
+    rgba = np.empty((height, width, 4), dtype=np.float32)
+    rgba[..., :3] = chroma[:height, :width] * luma[..., None]
+    rgba[..., 3] = 1.0
+    return rgba.ravel()
+
+
+def record_saved(path):
+    """Notes the size of a baked lighting file that was just written, for the panel."""
+    last_saved["path"] = path
+    last_saved["size"] = os.path.getsize(path) if os.path.isfile(path) else 0
+
+
+def format_bytes(size):
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024.0:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024.0
+    return f"{size:.2f} GiB"
@@ -0,0 +1,71 @@
+import json
+import os
+import time
+
+
+MANIFEST_SUFFIX = "compify_manifest.jsonl"
+
+
+def sidecar_path(output_prefix, name):
+    """Gets the path of a file kept next to renders written to `output_prefix` (an absolute path)."""
+    directory, prefix = os.path.split(output_prefix)
+    return os.path.join(directory, prefix + name)
+
+
+def manifest_path(output_prefix):
+    return sidecar_path(output_prefix, MANIFEST_SUFFIX)
+
+
+class RenderManifest:
+    """Per-frame record of a Compify render, kept next to its output.
+
+    Each frame entry holds its status ("rendering", "done" or "failed"), the
+    output path, the bake and render timings and a hash of the frame's
+    inputs. The file is a JSON line log: every record() appends one line
+    with the fields that changed, and reading replays the lines in order.
+    Several processes may render into the same manifest, since each line is
+    appended with a single write.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.frames = self._read()
+
+    def _read(self):
+        frames = {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        fields = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash.
+                        continue
+                    if isinstance(fields, dict) and "frame" in fields:
+                        frames.setdefault(str(fields.pop("frame")), {}).update(fields)
+        except OSError:
+            pass
+        return frames
+
+    def entry(self, frame):
+        return self.frames.get(str(frame))
+
+    def is_complete(self, frame, input_hash):
+        """Returns True if the frame was rendered from the same inputs and its output is still there."""
+        entry = self.entry(frame)
+        if entry is None or entry.get("status") != "done" or entry.get("input_hash") != input_hash:
+            return False
+        output = entry.get("output")
+        return output is not None and os.path.isfile(output) and os.path.getsize(output) > 0
+
+    def record(self, frame, **fields):
+        fields["updated"] = time.time()
+        self.frames.setdefault(str(frame), {}).update(fields)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        line = json.dumps(dict(fields, frame=frame), sort_keys=True) + "\n"
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
@@ -1,6 +1,7 @@
 MAIN_NODE_NAME = "Compify Footage"
 BAKE_IMAGE_NODE_NAME = "Baked Lighting"
 UV_LAYER_NAME = 'Compify Baked Lighting'
+COLOR_ATTRIBUTE_NAME = 'Compify Baked Lighting'
 
 # Gets the Compify Material name for the active scene.
 def compify_mat_name(context):
@@ -10,3 +11,13 @@ def compify_mat_name(context):
 # Gets the Compify baked lighting image name for the active scene.
 def compify_baked_texture_name(context):
     return "Compify Bake | " + context.scene.name
+
+
+# Gets the name of the scene lighting is baked in for the active scene.
+def compify_bake_scene_name(context):
+    return "Compify Bake Scene | " + context.scene.name
+
+
+# Gets the name of the scene baked lighting is denoised in for the active scene.
+def compify_denoise_scene_name(context):
+    return "Compify Denoise Scene | " + context.scene.name
@@ -0,0 +1,139 @@
+import time
+import traceback
+
+import bpy
+
+from .stage_clock import percentile
+
+
+# How often modal operators driven by a stage machine check whether it has
+# ended. Stage transitions never wait on this.
+HEARTBEAT_INTERVAL = 0.25
+
+# How often the bake watchdog checks on a running bake, in seconds.
+WATCHDOG_INTERVAL = 2.0
+
+# Number of recent bake durations the watchdog expects the next one from.
+WATCHDOG_HISTORY = 5
+
+
+class StageScheduler:
+    """Runs a stage machine's `step(context)` as soon as a job handler asks for it.
+
+    Bake and render completion handlers are called while Blender is still
+    tearing the job down, so a new job can't be started from inside them.
+    Instead of polling flags from a window timer, the handlers call
+    `schedule()`, which runs the step on the very next pass of the main event
+    loop with the original window as context.
+    """
+    def __init__(self, step, window):
+        self.step = step
+        self.window = window
+        self.pending = False
+
+    def schedule(self):
+        if not self.pending:
+            self.pending = True
+            bpy.app.timers.register(self._run, first_interval=0.0)
+
+    def cancel(self):
+        if self.pending and bpy.app.timers.is_registered(self._run):
+            bpy.app.timers.unregister(self._run)
+        self.pending = False
+
+    def _run(self):
+        self.pending = False
+        try:
+            if self.window is not None:
+                with bpy.context.temp_override(window=self.window):
+                    self.step(bpy.context)
+            else:
+                self.step(bpy.context)
+        except Exception:
+            traceback.print_exc()
+        return None # Don't repeat.
+
+
+class BakeWatchdog:
+    """Notices bakes that never report back.
+
+    Blender signals the end of a bake job through the bake (or render)
+    handlers, but a job that dies, e.g. on a device error, can end without
+    calling any of them, which would leave a stage machine waiting
+    forever. While a bake runs, the watchdog checks every few seconds
+    whether its job still exists, and calls `on_lost(reason)` once it has
+    ended without a word.
+
+    Bakes taking more than `factor` times the median of the last few bakes
+    (and at least `minimum` seconds) are flagged as overdue, and
+    `on_overdue(message)` is called once. That is only a warning: a running
+    job can't be stopped from Python, so overdue bakes are left to finish
+    or to be cancelled by hand.
+    """
+    def __init__(self, on_lost, factor, minimum, on_overdue=None):
+        self.on_lost = on_lost
+        self.on_overdue = on_overdue
+        self.factor = factor
+        self.minimum = minimum
+        self.durations = []
+        self.job_type = None
+        self.start_time = None
+        self.is_overdue = False
+        self.missing_checks = 0
+
+    def expected(self):
+        """Returns the expected bake duration in seconds, or None before the first bake."""
+        recent = sorted(self.durations[-WATCHDOG_HISTORY:])
+        if len(recent) == 0:
+            return None
+        return percentile(recent, 50)
+
+    def timeout(self):
+        expected = self.expected()
+        if expected is None:
+            return self.minimum
+        return max(self.minimum, expected * self.factor)
+
+    def start(self, job_type='OBJECT_BAKE'):
+        self.job_type = job_type
+        self.start_time = time.perf_counter()
+        self.is_overdue = False
+        self.missing_checks = 0
+        if not bpy.app.timers.is_registered(self._check):
+            bpy.app.timers.register(self._check, first_interval=WATCHDOG_INTERVAL)
+
+    def stop(self, succeeded=False):
+        if self.start_time is not None and succeeded:
+            self.durations.append(time.perf_counter() - self.start_time)
+        self.start_time = None
+        if bpy.app.timers.is_registered(self._check):
+            bpy.app.timers.unregister(self._check)
+
+    def _check(self):
+        if self.start_time is None:
+            return None
+        elapsed = time.perf_counter() - self.start_time
+        if bpy.app.is_job_running(self.job_type):
+            self.missing_checks = 0
+            if not self.is_overdue and elapsed > self.timeout():
+                self.is_overdue = True
+                message = (f"bake has been running for {elapsed:.0f}s, "
+                           f"expected about {self.expected() or 0.0:.0f}s")
+                print("Bake watchdog: " + message)
+                if self.on_overdue is not None:
+                    try:
+                        self.on_overdue(message)
+                    except Exception:
+                        traceback.print_exc()
+            return WATCHDOG_INTERVAL
+        # Completion handlers run as the job ends, so a job that is gone on
+        # two checks in a row has ended without them.
+        self.missing_checks += 1
+        if self.missing_checks < 2:
+            return WATCHDOG_INTERVAL
+        self.start_time = None
+        try:
+            self.on_lost(f"bake job ended without reporting back after {elapsed:.0f}s")
+        except Exception:
+            traceback.print_exc()
+        return None
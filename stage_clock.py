@@ -0,0 +1,138 @@
+"""Per-frame stage timing for Compify renders.
+
+This module doesn't import bpy, so it can be tested outside Blender.
+"""
+import csv
+import json
+import os
+import time
+
+
+class StageClock:
+    """Records per-frame wall time spent in each stage and idle between stages."""
+    def __init__(self):
+        self.frames = []
+        self.current = None
+        self.stage = None
+        self.stage_start = None
+        self.idle_start = None
+
+    def begin_frame(self, frame):
+        self.current = {"frame": frame, "idle": 0.0}
+        self.idle_start = time.perf_counter()
+
+    def end_frame(self):
+        """Adds the frame being recorded to the finished frames."""
+        if self.current is not None:
+            self.frames.append(self.current)
+        self.current = None
+        self.stage = None
+
+    def discard_frame(self):
+        """Forgets the frame being recorded, e.g. because it was skipped."""
+        self.current = None
+        self.stage = None
+        self.idle_start = None
+
+    def begin(self, stage):
+        """Starts timing `stage`, ending the stage being timed, if any."""
+        if self.stage is not None:
+            self.end()
+        now = time.perf_counter()
+        if self.idle_start is not None and self.current is not None:
+            self.current["idle"] += now - self.idle_start
+        self.idle_start = None
+        self.stage = stage
+        self.stage_start = now
+
+    def end(self):
+        now = time.perf_counter()
+        if self.stage is not None and self.current is not None:
+            self.current[self.stage] = self.current.get(self.stage, 0.0) + now - self.stage_start
+        self.stage = None
+        self.idle_start = now
+
+    def stage_names(self):
+        names = []
+        for frame in self.frames:
+            for key in frame:
+                if key != "frame" and key not in names:
+                    names.append(key)
+        return names
+
+    def statistics(self):
+        """Returns {stage: {count, total, mean, min, median, p95}} in seconds, plus a "frame" total."""
+        samples = {}
+        for frame in self.frames:
+            for key, value in frame.items():
+                if key != "frame":
+                    samples.setdefault(key, []).append(value)
+            samples.setdefault("frame", []).append(
+                sum(v for k, v in frame.items() if k != "frame"))
+        stats = {}
+        for stage, values in samples.items():
+            values = sorted(values)
+            count = len(values)
+            stats[stage] = {
+                "count": count,
+                "total": sum(values),
+                "mean": sum(values) / count,
+                "min": values[0],
+                "median": percentile(values, 50),
+                "p95": percentile(values, 95),
+            }
+        return stats
+
+    def progress_text(self, frames_total=None):
+        """Returns a status line with running stage averages and, if the frame count is known, an ETA."""
+        frames = self.frames
+        if len(frames) == 0:
+            return "Compify: starting"
+        stats = self.statistics()
+        parts = ["{} {:.2f}s".format(stage, info["mean"]) for stage, info in stats.items()
+                 if stage != "frame"]
+        text = "Compify: frame {}".format(len(frames))
+        if frames_total:
+            remaining = max(frames_total - len(frames), 0)
+            eta = int(stats["frame"]["mean"] * remaining)
+            text += "/{} | ETA {:d}:{:02d}:{:02d}".format(frames_total, eta // 3600, eta // 60 % 60, eta % 60)
+        return text + " | avg " + ", ".join(parts)
+
+    def write_report(self, path_base):
+        """Writes `<path_base>.json` (per-stage statistics and per-frame timings) and `<path_base>.csv`."""
+        frames = self.frames
+        directory = os.path.dirname(path_base)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path_base + ".json", "w") as f:
+            json.dump({"stages": self.statistics(), "frames": frames}, f, indent=2)
+        stages = self.stage_names()
+        with open(path_base + ".csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + stages + ["total"])
+            for frame in frames:
+                writer.writerow(
+                    [frame["frame"]]
+                    + ["{:.4f}".format(frame.get(stage, 0.0)) for stage in stages]
+                    + ["{:.4f}".format(sum(v for k, v in frame.items() if k != "frame"))]
+                )
+
+    def summary(self):
+        """Returns a one-line average of each stage over all recorded frames."""
+        if len(self.frames) == 0:
+            return "No frames recorded"
+        totals = {}
+        for frame in self.frames:
+            for key, value in frame.items():
+                if key != "frame":
+                    totals[key] = totals.get(key, 0.0) + value
+        count = len(self.frames)
+        return ", ".join(
+            "{} {:.3f}s".format(key, value / count) for key, value in totals.items()
+        ) + " (average per frame over {} frames)".format(count)
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(int(-(-len(sorted_values) * percent // 100)), 1)
+    return sorted_values[rank - 1]
@@ -0,0 +1,184 @@
+from .bake_cache import bake_objects_and_lights
+from .names import BAKE_IMAGE_NODE_NAME
+
+
+# Constraint/modifier attributes that point at another object whose motion
+# feeds into the constrained/modified object.
+TARGET_ATTRIBUTES = ("target", "object", "pole_target", "camera", "depth_object", "offset_object")
+
+# Modifier types whose result can change over time without any animation
+# data on the object itself.
+TIME_DEPENDENT_MODIFIERS = {'NODES', 'OCEAN', 'WAVE', 'FLUID', 'CLOTH', 'SOFT_BODY',
+                            'DYNAMIC_PAINT', 'EXPLODE', 'PARTICLE_SYSTEM', 'MESH_CACHE',
+                            'MESH_SEQUENCE_CACHE', 'COLLISION'}
+
+
+def _fcurve_varies(fcurve, frame_start, frame_end):
+    """Returns True if the F-Curve takes more than one value in the frame range."""
+    if fcurve.mute:
+        return False
+    if len(fcurve.modifiers) == 0 and len(fcurve.keyframe_points) > 0:
+        first = fcurve.keyframe_points[0].co[1]
+        if all(k.co[1] == first for k in fcurve.keyframe_points):
+            return False
+    first = fcurve.evaluate(frame_start)
+    for frame in range(frame_start + 1, frame_end + 1):
+        if fcurve.evaluate(frame) != first:
+            return True
+    return False
+
+
+def _animation_varies(id_data, frame_start, frame_end):
+    """Returns a reason string if the ID's animation data varies over the range, else None."""
+    if id_data is None:
+        return None
+    anim = getattr(id_data, "animation_data", None)
+    if anim is None:
+        return None
+    if len(anim.drivers) > 0:
+        return f"{id_data.name} has drivers"
+    for track in anim.nla_tracks:
+        if not track.mute and len(track.strips) > 0:
+            return f"{id_data.name} has NLA strips"
+    if anim.action is not None:
+        # Blender 4.4+ layered actions expose their F-Curves through
+        # channelbags; fall back to them when the legacy list is absent.
+        fcurves = getattr(anim.action, "fcurves", None)
+        if fcurves is None:
+            fcurves = []
+            for layer in anim.action.layers:
+                for strip in layer.strips:
+                    for channelbag in strip.channelbags:
+                        fcurves.extend(channelbag.fcurves)
+        for fcurve in fcurves:
+            if _fcurve_varies(fcurve, frame_start, frame_end):
+                return f"{id_data.name} animates {fcurve.data_path}"
+    return None
+
+
+def _node_tree_varies(node_tree, frame_start, frame_end):
+    if node_tree is None:
+        return None
+    reason = _animation_varies(node_tree, frame_start, frame_end)
+    if reason is not None:
+        return reason
+    for node in node_tree.nodes:
+        if node.name == BAKE_IMAGE_NODE_NAME:
+            # The baked lighting is the bake's output, not one of its inputs.
+            continue
+        image = getattr(node, "image", None)
+        if image is not None and image.source in {'MOVIE', 'SEQUENCE'}:
+            return f"{node_tree.name} uses the animated image {image.name}"
+    return None
+
+
+def _object_varies(obj, frame_start, frame_end, visited):
+    """Returns a reason string if anything feeding into the object varies, else None."""
+    if obj is None or obj.name in visited:
+        return None
+    visited.add(obj.name)
+
+    reason = _animation_varies(obj, frame_start, frame_end) \
+        or _animation_varies(obj.data, frame_start, frame_end)
+    if reason is not None:
+        return reason
+
+    if obj.type == 'MESH' and obj.data.shape_keys is not None:
+        reason = _animation_varies(obj.data.shape_keys, frame_start, frame_end)
+        if reason is not None:
+            return reason
+    if obj.type == 'LIGHT' and obj.data.use_nodes:
+        reason = _node_tree_varies(obj.data.node_tree, frame_start, frame_end)
+        if reason is not None:
+            return reason
+
+    reason = _object_varies(obj.parent, frame_start, frame_end, visited)
+    if reason is not None:
+        return f"{obj.name} has a varying parent: {reason}"
+
+    for constraint in obj.constraints:
+        if not constraint.enabled or constraint.influence == 0.0:
+            continue
+        for attr in TARGET_ATTRIBUTES:
+            reason = _object_varies(getattr(constraint, attr, None), frame_start, frame_end, visited)
+            if reason is not None:
+                return f"{obj.name} constraint {constraint.name} follows a varying target: {reason}"
+        for target in getattr(constraint, "targets", []):
+            reason = _object_varies(target.target, frame_start, frame_end, visited)
+            if reason is not None:
+                return f"{obj.name} constraint {constraint.name} follows a varying target: {reason}"
+
+    for modifier in getattr(obj, "modifiers", []):
+        if not modifier.show_render:
+            continue
+        if modifier.type in TIME_DEPENDENT_MODIFIERS:
+            return f"{obj.name} has a {modifier.type} modifier"
+        for attr in TARGET_ATTRIBUTES:
+            reason = _object_varies(getattr(modifier, attr, None), frame_start, frame_end, visited)
+            if reason is not None:
+                return f"{obj.name} modifier {modifier.name} uses a varying object: {reason}"
+
+    if len(getattr(obj, "particle_systems", [])) > 0:
+        return f"{obj.name} has particle systems"
+
+    return None
+
+
+def find_camera_variation(context, frame_start, frame_end):
+    """Returns a reason string if the footage camera moves or changes over the range, else None."""
+    scene = context.scene
+    if frame_end <= frame_start:
+        return None
+    camera = scene.compify_config.camera or scene.camera
+    reason = _object_varies(camera, frame_start, frame_end, set())
+    if reason is not None:
+        return f"the camera varies: {reason}"
+    return None
+
+
+def find_lighting_variation(context, frame_start, frame_end):
+    """Looks for anything that makes the baked lighting differ across a frame range.
+
+    Checks the animation data, drivers, constraints and modifiers of the
+    footage geo, reflectors and lights (and everything they depend on), the
+    materials of the footage geo and reflectors, which emit the footage into
+    bounce light, as well as the world. Camera space bakes also change with
+    the footage camera. Returns a human readable reason for the first
+    variation found, or None if the lighting is static over the range.
+    """
+    scene = context.scene
+    if frame_end <= frame_start:
+        return None
+
+    if scene.compify_config.bake_space == 'CAMERA':
+        reason = find_camera_variation(context, frame_start, frame_end)
+        if reason is not None:
+            return reason
+
+    bake_objects, lights = bake_objects_and_lights(scene.compify_config)
+    visited = set()
+    for obj in bake_objects + lights:
+        reason = _object_varies(obj, frame_start, frame_end, visited)
+        if reason is not None:
+            return reason
+
+    materials = {}
+    for obj in bake_objects:
+        for slot in getattr(obj, "material_slots", []):
+            if slot.material is not None:
+                materials[slot.material.name] = slot.material
+    for material in materials.values():
+        reason = _animation_varies(material, frame_start, frame_end)
+        if reason is None and material.use_nodes:
+            reason = _node_tree_varies(material.node_tree, frame_start, frame_end)
+        if reason is not None:
+            return reason
+
+    if scene.world is not None:
+        reason = _animation_varies(scene.world, frame_start, frame_end)
+        if reason is None and scene.world.use_nodes:
+            reason = _node_tree_varies(scene.world.node_tree, frame_start, frame_end)
+        if reason is not None:
+            return reason
+
+    return None
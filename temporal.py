@@ -0,0 +1,150 @@
+import numpy as np
+
+from .lighting_storage import pack, unpack
+
+
+class LightingKeys:
+    """Baked lighting kept for key frames only, blended for the frames in between.
+
+    Keys sit every `step` frames from the start of the range, plus the last
+    frame of the range. With a `threshold` above zero, key placement is
+    adaptive: when the lighting of two neighbouring keys differs by more
+    than the threshold (mean absolute difference relative to the mean
+    brightness), a key is added halfway between them, down to keys on
+    adjacent frames.
+
+    Frames must be lit in increasing order; keys before the current frame's
+    step interval are dropped to keep memory down. Keys are held in the
+    `storage` mode of lighting_storage.pack().
+    """
+    def __init__(self, frame_start, frame_end, step, threshold=0.0, storage='FLOAT'):
+        self.frame_start = frame_start
+        self.frame_end = frame_end
+        self.step = max(1, step)
+        self.threshold = threshold
+        self.storage = storage
+        self.keys = {}  # Frame -> packed pixels.
+        self.differences = {}  # (key, key) -> relative difference.
+
+    def _grid_interval(self, frame):
+        frame = min(max(frame, self.frame_start), self.frame_end)
+        k0 = self.frame_start + (frame - self.frame_start) // self.step * self.step
+        return k0, min(k0 + self.step, self.frame_end)
+
+    def _difference(self, k0, k1):
+        if (k0, k1) not in self.differences:
+            a = unpack(self.keys[k0]).reshape(-1, 4)[:, :3]
+            b = unpack(self.keys[k1]).reshape(-1, 4)[:, :3]
+            scale = max(float(np.mean(np.abs(a) + np.abs(b))) * 0.5, 1e-6)
+            self.differences[(k0, k1)] = float(np.mean(np.abs(a - b))) / scale
+        return self.differences[(k0, k1)]
+
+    def interval(self, frame):
+        """Returns (k0, k1, missing) for `frame`.
+
+        `k0` and `k1` are the keys the frame's lighting is blended from
+        (equal if the frame is a key itself) and `missing` is a key that has
+        to be baked before that interval is final, or None.
+        """
+        k0, k1 = self._grid_interval(frame)
+        while True:
+            if frame == k0 or frame == k1:
+                return frame, frame, None if frame in self.keys else frame
+            for key in (k0, k1):
+                if key not in self.keys:
+                    return k0, k1, key
+            if self.threshold <= 0.0 or k1 - k0 < 2 or self._difference(k0, k1) <= self.threshold:
+                return k0, k1, None
+            mid = (k0 + k1) // 2
+            if frame < mid:
+                k1 = mid
+            else:
+                k0 = mid
+
+    def next_missing(self, frame):
+        """Returns the next key frame to bake before `frame` can be lit, or None."""
+        return self.interval(frame)[2]
+
+    def store(self, frame, image):
+        pixels = np.empty(len(image.pixels), dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        self.keys[frame] = pack(pixels, image.size[0], self.storage)
+
+    def blend_into(self, frame, image):
+        """Writes the lighting for `frame`, blended from its keys, into `image`."""
+        k0, k1, missing = self.interval(frame)
+        assert missing is None
+        if k0 == k1:
+            pixels = unpack(self.keys[k0])
+        else:
+            t = (frame - k0) / (k1 - k0)
+            a = unpack(self.keys[k0])
+            pixels = a + (unpack(self.keys[k1]) - a) * np.float32(t)
+        image.pixels.foreach_set(pixels)
+        image.update()
+        self._prune(frame)
+
+    def _prune(self, frame):
+        # Keys of the frame's whole step interval stay, as adaptive key
+        # placement walks down to its sub-interval from there.
+        frame = self._grid_interval(frame)[0]
+        for key in [k for k in self.keys if k < frame]:
+            del self.keys[key]
+        self.differences = {
+            pair: d for pair, d in self.differences.items() if pair[0] >= frame
+        }
+
+
+class TemporalFilter:
+    """Exponential moving average of baked lighting over consecutive frames.
+
+    Each frame's bake is blended into the running average with weight
+    `blend`. Texels whose brightness changed by more than `reset_threshold`
+    (relative) take the new bake as it is, so moving lights and shadows
+    don't leave trails. The average restarts whenever a frame doesn't
+    follow the previous one. The average is held in the `storage` mode of
+    lighting_storage.pack().
+
+    The last unfiltered bake is kept as well, so that restore() can put it
+    back before a partial bake builds on the image.
+    """
+    def __init__(self, blend, reset_threshold, storage='FLOAT'):
+        self.blend = blend
+        self.reset_threshold = reset_threshold
+        self.storage = storage
+        self.history = None  # Packed pixels.
+        self.unfiltered = None  # Float pixels of the last bake, before filtering.
+        self.size = None
+        self.frame = None
+
+    def apply(self, frame, image):
+        """Blends `image`, baked for `frame`, into the average and writes the average back."""
+        pixels = np.empty(len(image.pixels), dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        self.unfiltered = pixels
+        if self.history is None or self.size != tuple(image.size) or frame != self.frame + 1:
+            self.history = pack(pixels, image.size[0], self.storage)
+            self.size = tuple(image.size)
+        else:
+            new = pixels.reshape(-1, 4)
+            old = unpack(self.history).reshape(-1, 4)
+            new_luma = new[:, :3].mean(axis=1)
+            old_luma = old[:, :3].mean(axis=1)
+            change = np.abs(new_luma - old_luma) / np.maximum(np.maximum(new_luma, old_luma), 1e-6)
+            average = old + (new - old) * self.blend
+            pixels = np.where((change > self.reset_threshold)[:, None], new, average).ravel()
+            self.history = pack(pixels, image.size[0], self.storage)
+            image.pixels.foreach_set(pixels)
+            image.update()
+        self.frame = frame
+
+    def restore(self, image):
+        """Writes the last unfiltered bake back into `image`.
+
+        Returns False if there is none for an image of that size.
+        """
+        if self.unfiltered is None or self.size != tuple(image.size):
+            return False
+        image.pixels.foreach_set(self.unfiltered)
+        image.update()
+        return True
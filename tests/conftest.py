@@ -0,0 +1,55 @@
+"""Test setup for the parts of Compify that don't need Blender.
+
+The add-on's __init__.py imports bpy, so the package is registered here
+without running it, as `compify` and under its directory name (which
+pytest imports it by). Only modules that don't import bpy can be tested.
+"""
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+package = types.ModuleType("compify")
+package.__path__ = [ROOT]
+for name in {"compify", os.path.basename(ROOT)}:
+    sys.modules.setdefault(name, package)
+
+
+class _Pixels:
+    def __init__(self, count):
+        self.data = np.zeros(count, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.data)
+
+    def foreach_get(self, out):
+        out[:] = self.data
+
+    def foreach_set(self, values):
+        self.data[:] = np.asarray(values, dtype=np.float32).ravel()
+
+
+class FakeImage:
+    """Just enough of bpy.types.Image for code that reads and writes pixels."""
+    def __init__(self, width, height, pixels=None):
+        self.size = (width, height)
+        self.pixels = _Pixels(width * height * 4)
+        if pixels is not None:
+            self.pixels.foreach_set(pixels)
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+
+    def read(self):
+        return self.pixels.data.copy()
+
+
+@pytest.fixture
+def make_image():
+    return FakeImage
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from compify.adaptive_samples import SampleController, relative_noise
+
+
+def grey(values):
+    """RGBA pixels whose RGB channels (and so luminance) are `values`."""
+    rgba = np.ones((len(values), 4), dtype=np.float32)
+    rgba[:, :3] = np.asarray(values, dtype=np.float32)[:, None]
+    return rgba.ravel()
+
+
+def noisy_baker(make_image, base, noise_at_one_sample):
+    """Gets a bake(samples, seed) whose bakes are off by ± noise / sqrt(samples) per texel."""
+    image = make_image(len(base), 1)
+    calls = []
+    sign = np.where(np.arange(len(base)) % 2 == 0, 1.0, -1.0)
+
+    def bake(samples, seed):
+        calls.append((samples, seed))
+        error = noise_at_one_sample / np.sqrt(samples) * sign * (1.0 if seed == 0 else -1.0)
+        image.pixels.foreach_set(grey(base * (1.0 + error)))
+        return image
+
+    return bake, image, calls
+
+
+def test_relative_noise_of_identical_bakes_is_zero():
+    a = grey([0.5, 1.0, 2.0])
+    assert relative_noise(a, a) == 0.0
+
+
+def test_relative_noise_ignores_unbaked_texels():
+    a = grey([1.1, 0.0, 0.0])
+    b = grey([0.9, 0.0, 0.0])
+    assert relative_noise(a, b) == pytest.approx(0.1, rel=1e-5)
+    assert relative_noise(grey([0.0]), grey([0.0])) == 0.0
+
+
+def test_calibration_jumps_to_the_predicted_sample_count(make_image):
+    base = np.full(64, 2.0)
+    bake, image, calls = noisy_baker(make_image, base, 0.8)
+    controller = SampleController(0.101, 4096)
+    total = controller.calibrate(bake)
+
+    # 16 samples per bake measure 0.2 noise, so the target needs about
+    # 125 samples: the second pair bakes 63 each and meets it.
+    assert calls == [(16, 0), (16, 1), (63, 0), (63, 1)]
+    assert total == 126
+    assert controller.samples == 126
+    # The image holds the average of the last pair.
+    assert np.allclose(image.read(), grey(base))
+
+
+def test_calibration_stops_at_max_samples(make_image):
+    bake, _, calls = noisy_baker(make_image, np.full(16, 1.0), 0.8)
+    total = SampleController(0.001, 64).calibrate(bake)
+    assert total == 64
+    assert calls[-1] == (32, 1)
+
+
+@pytest.mark.parametrize("max_samples, last_pair", [(33, 16), (3, 1), (2, 1), (65, 32)])
+def test_calibration_stops_at_an_odd_max_samples(make_image, max_samples, last_pair):
+    bake, _, calls = noisy_baker(make_image, np.full(16, 1.0), 0.8)
+    total = SampleController(0.001, max_samples).calibrate(bake)
+    assert total == last_pair * 2
+    assert calls[-1] == (last_pair, 1)
+
+
+def test_calibration_at_least_doubles_the_samples(make_image):
+    # Only slightly too noisy, but each pair doubles the samples anyway.
+    bake, _, calls = noisy_baker(make_image, np.full(16, 1.0), 0.21)
+    SampleController(0.05, 4096).calibrate(bake)
+    assert [samples for samples, seed in calls if seed == 0] == [16, 32]
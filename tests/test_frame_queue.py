@@ -0,0 +1,55 @@
+from compify.frame_queue import FrameQueue
+
+
+def test_workers_claim_each_frame_once(tmp_path):
+    queue = FrameQueue.create(str(tmp_path), 1, 5)
+    other = FrameQueue(str(tmp_path))
+    assert (other.frame_start, other.frame_end) == (1, 5)
+
+    assert queue.claim("a") == 1
+    assert other.claim("b") == 2
+    assert queue.claim("a", after=1) == 3
+    assert other.claim("b", after=4) == 5
+    assert queue.claim("a") == 4
+    assert queue.claim("a") is None
+
+
+def test_claims_mark_frames_done_once_the_next_is_requested(tmp_path):
+    queue = FrameQueue.create(str(tmp_path), 1, 3)
+    claims = queue.claims("a")
+    assert next(claims) == 1
+    assert queue.status() == ([], [], [1, 2, 3])
+    assert next(claims) == 2
+    assert queue.status() == ([1], [], [2, 3])
+    assert list(claims) == [3]
+    assert queue.status() == ([1, 2, 3], [], [])
+
+
+def test_a_stopped_worker_leaves_its_frame_claimed_but_unfinished(tmp_path):
+    queue = FrameQueue.create(str(tmp_path), 1, 3)
+    claims = queue.claims("a")
+    next(claims)
+    queue.fail(1, "out of memory")
+    claims.close()
+    assert queue.status() == ([], [1], [2, 3])
+    # Nobody else picks the failed frame up.
+    assert list(FrameQueue(str(tmp_path)).claims("b")) == [2, 3]
+
+
+def test_create_clears_an_earlier_run(tmp_path):
+    queue = FrameQueue.create(str(tmp_path), 1, 2)
+    list(queue.claims("a"))
+    queue.write_worker_stats("a", {"worker": "a", "frames": [1, 2]})
+    queue = FrameQueue.create(str(tmp_path), 1, 2)
+    assert queue.status() == ([], [], [1, 2])
+    assert queue.worker_stats() == {}
+    assert queue.claim("b") == 1
+
+
+def test_worker_stats(tmp_path):
+    queue = FrameQueue.create(str(tmp_path), 1, 2)
+    queue.write_worker_stats("0", {"worker": "0", "frames": [1]})
+    queue.write_worker_stats("1", {"worker": "1", "frames": [2]})
+    stats = queue.worker_stats()
+    assert sorted(stats) == ["0", "1"]
+    assert stats["1"]["frames"] == [2]
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from compify.lighting_storage import HALF_MAX, TEXEL_BYTES, format_bytes, pack, unpack
+
+
+def lighting(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    rgba[..., :3] = rng.uniform(0.0, 4.0, size=(height, width, 3))
+    return rgba.ravel()
+
+
+def test_float_round_trips_exactly():
+    pixels = lighting(5, 3)
+    assert np.array_equal(unpack(pack(pixels, 5, 'FLOAT')), pixels)
+
+
+def test_half_round_trips_to_half_precision():
+    pixels = lighting(5, 3)
+    packed = pack(pixels, 5, 'HALF')
+    assert packed["rgba"].dtype == np.float16
+    restored = unpack(packed)
+    assert restored.dtype == np.float32
+    assert np.allclose(restored, pixels, rtol=1e-3)
+
+
+def test_half_clamps_instead_of_overflowing():
+    pixels = np.array([1e6, -1e6, 2.0, 1.0], dtype=np.float32)
+    restored = unpack(pack(pixels, 1, 'HALF'))
+    assert restored.tolist() == [HALF_MAX, -HALF_MAX, 2.0, 1.0]
+
+
+@pytest.mark.parametrize("width, height", [(4, 4), (5, 3), (1, 1), (7, 2)])
+def test_luma_chroma_keeps_shape_and_uniform_color(width, height):
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    rgba[..., :3] = [0.5, 1.0, 2.0]
+    # Brightness varies per texel, color doesn't.
+    rgba[..., :3] *= np.linspace(0.5, 2.0, width * height).reshape(height, width, 1)
+    pixels = rgba.ravel()
+
+    packed = pack(pixels, width, 'LUMA_CHROMA')
+    assert packed["luma"].shape == (height, width)
+    assert packed["chroma"].shape == ((height + 1) // 2, (width + 1) // 2, 3)
+    restored = unpack(packed)
+    assert restored.shape == pixels.shape
+    assert np.allclose(restored, pixels, rtol=2e-3)
+
+
+def test_luma_chroma_keeps_black_texels_black():
+    rgba = np.zeros((2, 2, 4), dtype=np.float32)
+    rgba[0, 0] = [1.0, 0.5, 0.25, 1.0]
+    restored = unpack(pack(rgba.ravel(), 2, 'LUMA_CHROMA')).reshape(2, 2, 4)
+    assert np.all(restored[1, :, :3] == 0.0)
+    assert np.all(restored[0, 1, :3] == 0.0)
+    # The black texels don't pull the lit texel's color towards grey.
+    assert np.allclose(restored[0, 0, :3], [1.0, 0.5, 0.25], rtol=2e-3)
+
+
+def test_luma_chroma_is_smaller():
+    width, height = 64, 32
+    packed = pack(lighting(width, height), width, 'LUMA_CHROMA')
+    nbytes = sum(a.nbytes for a in packed.values())
+    assert nbytes == pytest.approx(width * height * TEXEL_BYTES['LUMA_CHROMA'])
+
+
+def test_format_bytes():
+    assert format_bytes(512) == "512 B"
+    assert format_bytes(2048) == "2.0 KiB"
+    assert format_bytes(3 * 1024 ** 2) == "3.0 MiB"
+    assert format_bytes(5 * 1024 ** 3) == "5.00 GiB"
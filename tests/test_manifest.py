@@ -0,0 +1,84 @@
+import os
+
+from compify.manifest import RenderManifest, manifest_path, sidecar_path
+
+
+def test_sidecar_paths_sit_next_to_the_output():
+    assert sidecar_path("/renders/shot_", "compify_timings") == "/renders/shot_compify_timings"
+    assert manifest_path("/renders/shot_") == "/renders/shot_compify_manifest.jsonl"
+
+
+def test_records_are_merged_per_frame_when_read_back(tmp_path):
+    path = str(tmp_path / "manifest.jsonl")
+    manifest = RenderManifest(path)
+    manifest.record(1, status="rendering", output="a.png", input_hash="h1")
+    manifest.record(2, status="rendering")
+    manifest.record(1, status="done", render_time=2.5)
+
+    entry = RenderManifest(path).entry(1)
+    assert entry["status"] == "done"
+    assert entry["output"] == "a.png"
+    assert entry["input_hash"] == "h1"
+    assert entry["render_time"] == 2.5
+    assert RenderManifest(path).entry(2)["status"] == "rendering"
+    assert RenderManifest(path).entry(3) is None
+
+
+def test_each_record_appends_one_line(tmp_path):
+    path = str(tmp_path / "manifest.jsonl")
+    manifest = RenderManifest(path)
+    for frame in range(1, 4):
+        manifest.record(frame, status="rendering")
+        manifest.record(frame, status="done")
+    with open(path) as f:
+        assert len(f.readlines()) == 6
+
+
+def test_processes_sharing_a_manifest_keep_each_others_frames(tmp_path):
+    path = str(tmp_path / "manifest.jsonl")
+    a = RenderManifest(path)
+    b = RenderManifest(path)
+    a.record(1, status="done")
+    b.record(2, status="done")
+    merged = RenderManifest(path)
+    assert merged.entry(1)["status"] == "done"
+    assert merged.entry(2)["status"] == "done"
+
+
+def test_a_line_cut_short_is_ignored(tmp_path):
+    path = str(tmp_path / "manifest.jsonl")
+    RenderManifest(path).record(1, status="done")
+    with open(path, "a") as f:
+        f.write('{"frame": 2, "stat')
+    manifest = RenderManifest(path)
+    assert manifest.entry(1)["status"] == "done"
+    assert manifest.entry(2) is None
+
+
+def test_is_complete(tmp_path):
+    output = tmp_path / "frame_0001.png"
+    path = str(tmp_path / "manifest.jsonl")
+    manifest = RenderManifest(path)
+    manifest.record(1, status="done", output=str(output), input_hash="h1")
+    # The output is missing.
+    assert not manifest.is_complete(1, "h1")
+    output.write_bytes(b"png")
+    assert manifest.is_complete(1, "h1")
+    assert not manifest.is_complete(1, "h2")
+    assert not manifest.is_complete(2, "h1")
+    manifest.record(1, status="failed")
+    assert not manifest.is_complete(1, "h1")
+
+
+def test_an_empty_output_is_not_complete(tmp_path):
+    output = tmp_path / "frame_0001.png"
+    output.write_bytes(b"")
+    manifest = RenderManifest(str(tmp_path / "manifest.jsonl"))
+    manifest.record(1, status="done", output=str(output), input_hash="h1")
+    assert not manifest.is_complete(1, "h1")
+
+
+def test_the_directory_is_created(tmp_path):
+    path = str(tmp_path / "new" / "manifest.jsonl")
+    RenderManifest(path).record(1, status="rendering")
+    assert os.path.isfile(path)
@@ -0,0 +1,102 @@
+import json
+import time
+
+import pytest
+
+from compify.stage_clock import StageClock, percentile
+
+
+def sleep_stage(clock, stage, seconds):
+    clock.begin(stage)
+    time.sleep(seconds)
+
+
+def test_stages_and_idle_time_are_recorded_per_frame():
+    clock = StageClock()
+    clock.begin_frame(1)
+    time.sleep(0.01)
+    sleep_stage(clock, "bake", 0.02)
+    clock.end()
+    time.sleep(0.01)
+    sleep_stage(clock, "render", 0.01)
+    clock.end()
+    clock.end_frame()
+
+    frame = clock.frames[0]
+    assert frame["frame"] == 1
+    assert frame["bake"] >= 0.02
+    assert frame["render"] >= 0.01
+    assert frame["idle"] >= 0.02
+
+
+def test_beginning_a_stage_ends_the_open_one():
+    clock = StageClock()
+    clock.begin_frame(1)
+    sleep_stage(clock, "bake_setup", 0.02)
+    sleep_stage(clock, "bake", 0.01)
+    clock.end()
+    clock.end_frame()
+
+    frame = clock.frames[0]
+    assert frame["bake_setup"] >= 0.02
+    assert frame["bake"] >= 0.01
+    assert frame["bake_setup"] + frame["bake"] >= 0.03
+
+
+def test_repeated_stages_add_up():
+    clock = StageClock()
+    clock.begin_frame(1)
+    sleep_stage(clock, "bake_finish", 0.01)
+    sleep_stage(clock, "bake_denoise", 0.0)
+    sleep_stage(clock, "bake_finish", 0.01)
+    clock.end()
+    clock.end_frame()
+    assert clock.frames[0]["bake_finish"] >= 0.02
+
+
+def test_a_discarded_frame_leaves_nothing_behind():
+    clock = StageClock()
+    clock.begin_frame(1)
+    sleep_stage(clock, "frame_setup", 0.01)
+    clock.discard_frame()
+    clock.begin_frame(2)
+    clock.begin("frame_set")
+    clock.end()
+    clock.end_frame()
+    assert [f["frame"] for f in clock.frames] == [2]
+    assert "frame_setup" not in clock.frames[0]
+
+
+def test_statistics_and_progress():
+    clock = StageClock()
+    assert clock.progress_text(10) == "Compify: starting"
+    for frame, seconds in ((1, 1.0), (2, 3.0), (3, 2.0)):
+        clock.frames.append({"frame": frame, "idle": 0.0, "render": seconds})
+    stats = clock.statistics()
+    assert stats["render"]["count"] == 3
+    assert stats["render"]["median"] == 2.0
+    assert stats["render"]["min"] == 1.0
+    assert stats["frame"]["total"] == pytest.approx(6.0)
+    # Two frames mean 2 s each to go.
+    assert "frame 3/5 | ETA 0:00:04" in clock.progress_text(5)
+
+
+def test_write_report(tmp_path):
+    clock = StageClock()
+    clock.frames = [{"frame": 1, "idle": 0.5, "bake": 2.0}, {"frame": 2, "idle": 0.5, "render": 1.0}]
+    base = str(tmp_path / "out" / "shot_compify_timings")
+    clock.write_report(base)
+    with open(base + ".json") as f:
+        report = json.load(f)
+    assert report["frames"] == clock.frames
+    with open(base + ".csv") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "frame,idle,bake,render,total"
+    assert lines[2] == "2,0.5000,0.0000,1.0000,1.5000"
+
+
+def test_percentile():
+    values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert percentile(values, 50) == 5
+    assert percentile(values, 95) == 10
+    assert percentile([7], 95) == 7
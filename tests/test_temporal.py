@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from compify.temporal import LightingKeys
+
+
+def constant(value, width=2, height=2):
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    rgba[..., :3] = value
+    return rgba.ravel()
+
+
+def bake_keys(keys, make_image, frame, lighting):
+    """Bakes every key `frame` needs from `lighting(key)`, in order, like the render pipeline."""
+    baked = []
+    while True:
+        key = keys.next_missing(frame)
+        if key is None:
+            return baked
+        keys.store(key, make_image(2, 2, lighting(key)))
+        baked.append(key)
+
+
+def test_keys_sit_every_step_and_on_the_last_frame(make_image):
+    keys = LightingKeys(1, 10, 4)
+    assert keys.interval(3) == (1, 5, 1)
+    assert bake_keys(keys, make_image, 3, lambda f: constant(f)) == [1, 5]
+    assert keys.interval(3) == (1, 5, None)
+    assert keys.interval(5) == (5, 5, None)
+    assert keys.interval(9) == (9, 9, 9)
+    assert keys.interval(10) == (10, 10, 10)
+
+
+def test_blend_into_interpolates_between_keys(make_image):
+    keys = LightingKeys(1, 9, 4)
+    bake_keys(keys, make_image, 2, lambda f: constant(f * 2.0))
+    image = make_image(2, 2)
+    keys.blend_into(2, image)
+    # Keys 1 and 5 hold 2.0 and 10.0; frame 2 is a quarter of the way.
+    assert np.allclose(image.read(), constant(4.0))
+    assert image.updates == 1
+
+    keys.blend_into(5, image)
+    assert np.allclose(image.read(), constant(10.0))
+
+
+def test_blend_into_needs_its_keys(make_image):
+    keys = LightingKeys(1, 9, 4)
+    with pytest.raises(AssertionError):
+        keys.blend_into(2, make_image(2, 2))
+
+
+def test_adaptive_keys_are_added_where_lighting_changes(make_image):
+    # Lighting jumps between frames 3 and 4.
+    lighting = lambda f: constant(1.0 if f <= 3 else 5.0)
+    keys = LightingKeys(1, 9, 8, threshold=0.1)
+    baked = bake_keys(keys, make_image, 2, lighting)
+    assert baked == [1, 9, 5, 3]
+    assert keys.interval(2) == (1, 3, None)
+
+    image = make_image(2, 2)
+    keys.blend_into(2, image)
+    assert np.allclose(image.read(), constant(1.0))
+
+
+def test_without_threshold_keys_stay_on_the_grid(make_image):
+    keys = LightingKeys(1, 9, 8)
+    assert bake_keys(keys, make_image, 2, lambda f: constant(1.0 if f <= 3 else 5.0)) == [1, 9]
+
+
+def test_keys_before_the_current_interval_are_dropped(make_image):
+    keys = LightingKeys(1, 13, 4)
+    image = make_image(2, 2)
+    for frame in range(1, 11):
+        bake_keys(keys, make_image, frame, lambda f: constant(f))
+        keys.blend_into(frame, image)
+    assert sorted(keys.keys) == [9, 13]
+
+
+@pytest.mark.parametrize("storage", ['FLOAT', 'HALF', 'LUMA_CHROMA'])
+def test_keys_in_every_storage_mode(make_image, storage):
+    keys = LightingKeys(1, 5, 4, storage=storage)
+    bake_keys(keys, make_image, 3, lambda f: constant(f))
+    image = make_image(2, 2)
+    keys.blend_into(3, image)
+    assert np.allclose(image.read(), constant(3.0), rtol=2e-3)
@@ -0,0 +1,57 @@
+import numpy as np
+
+from compify.temporal import TemporalFilter
+
+
+def constant(value, width=2, height=2):
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    rgba[..., :3] = value
+    return rgba.ravel()
+
+
+def test_temporal_filter_passes_the_first_frame_through(make_image):
+    image = make_image(2, 2, constant(1.0))
+    TemporalFilter(0.25, 0.5).apply(1, image)
+    assert np.allclose(image.read(), constant(1.0))
+
+
+def test_temporal_filter_blends_consecutive_frames(make_image):
+    temporal = TemporalFilter(0.25, 0.5)
+    temporal.apply(1, make_image(2, 2, constant(1.0)))
+    image = make_image(2, 2, constant(1.2))
+    temporal.apply(2, image)
+    assert np.allclose(image.read(), constant(1.05))
+    image = make_image(2, 2, constant(1.2))
+    temporal.apply(3, image)
+    assert np.allclose(image.read(), constant(1.05 + 0.15 * 0.25))
+
+
+def test_temporal_filter_resets_texels_that_jump(make_image):
+    temporal = TemporalFilter(0.25, 0.5)
+    temporal.apply(1, make_image(2, 1, constant(1.0, 2, 1)))
+    new = constant(1.0, 2, 1)
+    new[:3] = 4.0  # The first texel is lit by a light that moved in.
+    image = make_image(2, 1, new)
+    temporal.apply(2, image)
+    assert np.allclose(image.read()[:3], 4.0)
+    assert np.allclose(image.read()[4:7], 1.0)
+
+
+def test_temporal_filter_restarts_after_a_gap(make_image):
+    temporal = TemporalFilter(0.25, 0.5)
+    temporal.apply(1, make_image(2, 2, constant(1.0)))
+    image = make_image(2, 2, constant(1.2))
+    temporal.apply(3, image)
+    assert np.allclose(image.read(), constant(1.2))
+
+
+def test_temporal_filter_restores_the_unfiltered_bake(make_image):
+    temporal = TemporalFilter(0.25, 0.5)
+    assert not temporal.restore(make_image(2, 2))
+    temporal.apply(1, make_image(2, 2, constant(1.0)))
+    image = make_image(2, 2, constant(1.2))
+    temporal.apply(2, image)
+    assert not np.allclose(image.read(), constant(1.2))
+    assert temporal.restore(image)
+    assert np.allclose(image.read(), constant(1.2))
+    assert not temporal.restore(make_image(4, 4))
@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+
+from compify.uv_utils import UVCoverage, jump_flood, shifted
+
+
+def brute_force_distances(covered):
+    """Squared distance from every texel to its nearest covered texel."""
+    rows, columns = np.indices(covered.shape)
+    ys, xs = np.nonzero(covered)
+    d = np.square(rows[..., None] - ys) + np.square(columns[..., None] - xs)
+    return d.min(axis=-1)
+
+
+def found_distances(nearest, width):
+    rows, columns = np.indices(nearest.shape)
+    row, column = np.divmod(nearest, width)
+    return np.square(row - rows) + np.square(column - columns)
+
+
+def test_shifted_moves_contents_and_fills_the_edge():
+    a = np.arange(12).reshape(3, 4)
+    out = shifted(a, 1, -1, -1)
+    assert out[0].tolist() == [-1, -1, -1, -1]
+    assert out[1].tolist() == [1, 2, 3, -1]
+    assert out[2].tolist() == [5, 6, 7, -1]
+
+
+@pytest.mark.parametrize("dy, dx", [(3, 0), (0, -4), (10, 10), (-5, 1)])
+def test_shifted_past_the_edge_is_all_fill(dy, dx):
+    a = np.ones((3, 4), dtype=np.int32)
+    assert np.all(shifted(a, dy, dx, 0) == 0)
+
+
+def test_jump_flood_covered_texels_are_their_own_nearest():
+    covered = np.zeros((5, 7), dtype=bool)
+    covered[1, 2] = covered[4, 6] = True
+    nearest = jump_flood(covered, 3)
+    assert nearest[1, 2] == 1 * 7 + 2
+    assert nearest[4, 6] == 4 * 7 + 6
+
+
+def test_jump_flood_finds_corner_texels_of_non_square_images():
+    # Flat indices are row * width + column, which a square image can't check.
+    covered = np.zeros((3, 9), dtype=bool)
+    covered[0, 0] = covered[2, 8] = True
+    nearest = jump_flood(covered, 20)
+    assert nearest[0, 1] == 0
+    assert nearest[1, 0] == 0
+    assert nearest[2, 7] == 2 * 9 + 8
+    assert nearest[1, 8] == 2 * 9 + 8
+
+
+def test_jump_flood_cuts_off_at_distance():
+    covered = np.zeros((1, 12), dtype=bool)
+    covered[0, 0] = True
+    nearest = jump_flood(covered, 4)
+    assert nearest[0, :5].tolist() == [0, 0, 0, 0, 0]  # Up to and including 4 texels away.
+    assert nearest[0, 5:].tolist() == [-1] * 7
+
+
+def test_jump_flood_cutoff_is_euclidean():
+    covered = np.zeros((6, 6), dtype=bool)
+    covered[0, 0] = True
+    nearest = jump_flood(covered, 3)
+    assert nearest[2, 2] == 0  # sqrt(8) <= 3
+    assert nearest[2, 3] == -1  # sqrt(13) > 3
+    assert nearest[0, 3] == 0
+
+
+def test_jump_flood_margin_wider_than_the_image():
+    covered = np.zeros((4, 3), dtype=bool)
+    covered[3, 2] = True
+    nearest = jump_flood(covered, 64)
+    assert np.all(nearest == 3 * 3 + 2)
+
+
+def test_jump_flood_without_covered_texels():
+    nearest = jump_flood(np.zeros((4, 4), dtype=bool), 8)
+    assert np.all(nearest == -1)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_jump_flood_matches_exact_search(seed):
+    rng = np.random.default_rng(seed)
+    height, width = rng.integers(1, 40, size=2)
+    covered = rng.random((height, width)) < rng.uniform(0.005, 0.3)
+    covered[rng.integers(height), rng.integers(width)] = True
+    distance = int(rng.integers(1, 40))
+
+    nearest = jump_flood(covered, distance)
+    exact = brute_force_distances(covered)
+    within = exact <= distance * distance
+    assert np.array_equal(nearest >= 0, within)
+    assert np.all(covered.ravel()[nearest[within]])
+    assert np.array_equal(found_distances(nearest, width)[within], exact[within])
+
+
+def coverage(island):
+    owner = np.where(island > 0, 0, -1)
+    return UVCoverage(island.shape[0], ["Proxy"], island, owner)
+
+
+def test_margin_texels_fill_uncovered_texels_from_covered_ones():
+    island = np.zeros((6, 6), dtype=np.int32)
+    island[2:4, 2:4] = 1
+    targets, sources = coverage(island).margin_texels(1)
+
+    covered = island.ravel() > 0
+    assert not np.any(covered[targets])
+    assert np.all(covered[sources])
+    # The 8 texels sharing an edge with the 2x2 block, but not its corners.
+    assert sorted(targets.tolist()) == sorted([1 * 6 + 2, 1 * 6 + 3, 4 * 6 + 2, 4 * 6 + 3,
+                                               2 * 6 + 1, 3 * 6 + 1, 2 * 6 + 4, 3 * 6 + 4])
+    pixels = np.zeros(36)
+    pixels[covered] = 5.0
+    pixels[targets] = pixels[sources]
+    assert np.count_nonzero(pixels) == 12
+
+
+def test_margin_texels_are_cached_per_distance():
+    island = np.zeros((8, 8), dtype=np.int32)
+    island[3, 3] = 1
+    uv = coverage(island)
+    first = uv.margin_texels(2)
+    assert uv.margin_texels(2) is first
+    assert len(uv.margin_texels(3)[0]) > len(first[0])
+
+
+def test_object_mask():
+    island = np.array([[1, 1, 2], [0, 3, 3]], dtype=np.int32)
+    owner = np.array([[0, 0, 0], [-1, 1, 1]])
+    uv = UVCoverage(3, ["Floor", "Wall"], island, owner)
+
+    class Obj:
+        def __init__(self, name):
+            self.name = name
+
+    assert uv.object_mask([Obj("Wall")]).tolist() == [[False, False, False], [False, True, True]]
+    assert uv.object_mask([Obj("Missing")]).sum() == 0
@@ -1,5 +1,8 @@
+import hashlib
 from math import inf
 
+import numpy as np
+
 
 def leftmost_u(mesh_objects, uv_layer_name):
     leftmost = inf
@@ -8,3 +11,169 @@ def leftmost_u(mesh_objects, uv_layer_name):
         for uv in uvs:
             leftmost = min(leftmost, uv.uv[0])
     return leftmost
+
+
+class UVCoverage:
+    """Which texels of a square UV atlas are covered, and by which object and UV island.
+
+    `island` holds a 1-based island number per texel (0 where no face
+    covers the texel), unique across objects. `owner` holds the index into
+    `names` of the object covering each texel (-1 where none does). Both
+    are indexed [row, column] like image pixels, with row 0 at v = 0.
+    """
+    def __init__(self, resolution, names, island, owner):
+        self.resolution = resolution
+        self.names = names
+        self.island = island
+        self.owner = owner
+        self.margins = {}  # Margin width -> (target, source) flat texel indices.
+
+    def object_mask(self, objects):
+        """Gets a boolean mask of the texels covered by any of `objects`."""
+        wanted = {obj.name for obj in objects}
+        indices = [i for i, name in enumerate(self.names) if name in wanted]
+        return np.isin(self.owner, indices)
+
+    def margin_texels(self, distance):
+        """Gets the uncovered texels within `distance` texels of a covered one, and the nearest covered texel of each.
+
+        Returns (targets, sources) as arrays of flat texel indices, so a
+        margin is filled by copying pixels[sources] to pixels[targets].
+        """
+        if distance not in self.margins:
+            nearest = jump_flood(self.island > 0, distance).ravel()
+            targets = np.flatnonzero((nearest >= 0) & (self.island.ravel() == 0))
+            self.margins[distance] = (targets.astype(np.int32), nearest[targets])
+        return self.margins[distance]
+
+
+def shifted(a, dy, dx, fill):
+    """Gets `a` shifted by (dy, dx) texels, with `fill` where it shifted in from outside."""
+    out = np.full_like(a, fill)
+    h, w = a.shape[:2]
+    if abs(dy) >= h or abs(dx) >= w:
+        return out
+    out[max(dy, 0):h + min(dy, 0), max(dx, 0):w + min(dx, 0)] = \
+        a[max(-dy, 0):h + min(-dy, 0), max(-dx, 0):w + min(-dx, 0)]
+    return out
+
+
+def jump_flood(covered, distance):
+    """Finds the nearest covered texel of every texel with the jump flooding algorithm.
+
+    Returns an array shaped like `covered` holding the flat index of the
+    nearest covered texel, or -1 where none is within `distance` texels.
+    Two extra passes at steps 2 and 1 fix the rare texels plain jump
+    flooding leaves with a slightly farther texel.
+    """
+    height, width = covered.shape
+    rows, columns = np.indices((height, width), dtype=np.int32)
+    nearest = np.where(covered, rows * width + columns, -1).astype(np.int32)
+    best = np.where(covered, 0.0, np.inf).astype(np.float32)
+    step = 1 << max(int(distance) - 1, 0).bit_length()
+    steps = []
+    while step >= 1:
+        steps.append(step)
+        step //= 2
+    for step in steps + [2, 1]:
+        for dy in (-step, 0, step):
+            for dx in (-step, 0, step):
+                if dy == 0 and dx == 0:
+                    continue
+                candidate = shifted(nearest, dy, dx, -1)
+                row, column = np.divmod(candidate, width)
+                d = np.square(row - rows, dtype=np.float32) + np.square(column - columns, dtype=np.float32)
+                better = (candidate >= 0) & (d < best)
+                nearest[better] = candidate[better]
+                best[better] = d[better]
+    nearest[best > float(distance) ** 2] = -1
+    return nearest
+
+
+# The last computed coverage, as (key, UVCoverage).
+_coverage_cache = (None, None)
+
+
+def _uv_triangles(mesh, uv_layer_name):
+    """Gets the UV triangles of a mesh as an (n, 3, 2) array, and each one's polygon index."""
+    mesh.calc_loop_triangles()
+    count = len(mesh.loop_triangles)
+    loops = np.empty(count * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("loops", loops)
+    polygons = np.empty(count, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("polygon_index", polygons)
+    uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    mesh.uv_layers[uv_layer_name].data.foreach_get("uv", uvs)
+    return uvs.reshape(-1, 2)[loops].reshape(count, 3, 2), polygons
+
+
+def _polygon_islands(mesh, uv_layer_name):
+    """Gets the 0-based UV island number of each polygon of a mesh."""
+    from bpy_extras.mesh_utils import mesh_linked_uv_islands
+
+    active = mesh.uv_layers.active
+    mesh.uv_layers.active = mesh.uv_layers[uv_layer_name]
+    try:
+        islands = mesh_linked_uv_islands(mesh)
+    finally:
+        mesh.uv_layers.active = active
+    polygon_island = np.zeros(len(mesh.polygons), dtype=np.int32)
+    for i, polygons in enumerate(islands):
+        polygon_island[polygons] = i
+    return polygon_island, len(islands)
+
+
+def _rasterize(triangles, values, resolution, out):
+    """Writes `values[i]` to every texel of `out` whose center lies in UV triangle i."""
+    scaled = triangles * resolution - 0.5  # Texel centers at integer coordinates.
+    for (a, b, c), value in zip(scaled, values):
+        lo = np.maximum(np.floor(np.minimum(np.minimum(a, b), c)).astype(int), 0)
+        hi = np.minimum(np.ceil(np.maximum(np.maximum(a, b), c)).astype(int), resolution - 1)
+        if lo[0] > hi[0] or lo[1] > hi[1]:
+            continue
+        xs, ys = np.meshgrid(np.arange(lo[0], hi[0] + 1), np.arange(lo[1], hi[1] + 1))
+        area = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+        if area == 0.0:
+            continue
+        w0 = ((b[0] - xs) * (c[1] - ys) - (b[1] - ys) * (c[0] - xs)) / area
+        w1 = ((c[0] - xs) * (a[1] - ys) - (c[1] - ys) * (a[0] - xs)) / area
+        inside = (w0 >= 0.0) & (w1 >= 0.0) & (w0 + w1 <= 1.0)
+        out[ys[inside], xs[inside]] = value
+
+
+def uv_coverage(objects, uv_layer_name, resolution):
+    """Gets the UVCoverage of `objects`' UV layer `uv_layer_name` at `resolution`².
+
+    Rasterizing is slow for dense meshes, so the result is cached until
+    the objects, their UVs or the resolution change.
+    """
+    global _coverage_cache
+
+    objects = sorted((obj for obj in objects if obj.type == 'MESH' and uv_layer_name in obj.data.uv_layers),
+                     key=lambda obj: obj.name)
+    h = hashlib.sha1()
+    h.update(str(resolution).encode())
+    for obj in objects:
+        h.update(obj.name.encode())
+        uvs = np.empty(len(obj.data.loops) * 2, dtype=np.float32)
+        obj.data.uv_layers[uv_layer_name].data.foreach_get("uv", uvs)
+        h.update(uvs.tobytes())
+    key = h.hexdigest()
+    if _coverage_cache[0] == key:
+        return _coverage_cache[1]
+
+    island = np.zeros((resolution, resolution), dtype=np.int32)
+    first_islands = []  # The first island number of each object.
+    island_offset = 1
+    for obj in objects:
+        triangles, polygons = _uv_triangles(obj.data, uv_layer_name)
+        polygon_island, island_count = _polygon_islands(obj.data, uv_layer_name)
+        _rasterize(triangles, polygon_island[polygons] + island_offset, resolution, island)
+        first_islands.append(island_offset)
+        island_offset += island_count
+    owner = np.searchsorted(np.array(first_islands, dtype=np.int32), island, side='right') - 1
+    owner[island == 0] = -1
+
+    coverage = UVCoverage(resolution, [obj.name for obj in objects], island, owner)
+    _coverage_cache = (key, coverage)
+    return coverage
@@ -0,0 +1,42 @@
+from .names import MAIN_NODE_NAME, BAKE_IMAGE_NODE_NAME, COLOR_ATTRIBUTE_NAME
+
+
+# Name of the node that reads vertex color baked lighting in Compify materials.
+ATTRIBUTE_NODE_NAME = "Baked Lighting Attribute"
+
+
+def ensure_lighting_attribute(obj):
+    """Ensures `obj`'s mesh has the float color attribute lighting is baked to, and makes it the active one.
+
+    Vertex color bakes write to each mesh's active color attribute.
+    """
+    attributes = obj.data.color_attributes
+    attribute = attributes.get(COLOR_ATTRIBUTE_NAME)
+    if attribute is None:
+        attribute = attributes.new(COLOR_ATTRIBUTE_NAME, 'FLOAT_COLOR', 'POINT')
+    if attributes.active_color_name != COLOR_ATTRIBUTE_NAME:
+        attributes.active_color_name = COLOR_ATTRIBUTE_NAME
+    return attribute
+
+
+def link_lighting_source(material, vertex_colors):
+    """Feeds the Compify Footage node of `material` from the baked lighting color attribute or the Baked Lighting image."""
+    nodes = material.node_tree.nodes
+    if MAIN_NODE_NAME not in nodes or BAKE_IMAGE_NODE_NAME not in nodes:
+        return
+    if vertex_colors:
+        if ATTRIBUTE_NODE_NAME not in nodes:
+            image_node = nodes[BAKE_IMAGE_NODE_NAME]
+            attribute_node = nodes.new(type='ShaderNodeVertexColor')
+            attribute_node.name = ATTRIBUTE_NODE_NAME
+            attribute_node.label = ATTRIBUTE_NODE_NAME
+            attribute_node.layer_name = COLOR_ATTRIBUTE_NAME
+            attribute_node.location = (image_node.location.x, image_node.location.y - 300.0)
+            # The active image node is the bake target, so keep it active.
+            nodes.active = image_node
+        source = nodes[ATTRIBUTE_NODE_NAME].outputs['Color']
+    else:
+        source = nodes[BAKE_IMAGE_NODE_NAME].outputs['Color']
+    baked_lighting = nodes[MAIN_NODE_NAME].inputs['Baked Lighting']
+    if not (baked_lighting.is_linked and baked_lighting.links[0].from_socket == source):
+        material.node_tree.links.new(source, baked_lighting)